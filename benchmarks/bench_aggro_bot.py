@@ -0,0 +1,108 @@
+# --- START OF FILE bench_aggro_bot.py ---
+"""
+Benchmark of AggroBot.move().
+
+Plays seeded games of AggroBots only and reports the average time of a move for every board
+size and bot count, plus a checksum of all the directions played. Two versions of the bot
+play the same games exactly when their checksums match, so the checksum tells whether an
+optimisation changed the bot's behaviour.
+
+Usage:
+    python benchmarks/bench_aggro_bot.py
+    python benchmarks/bench_aggro_bot.py --sizes 40 100 --bots 8 32 --ticks 300 --games 3
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+import zlib
+
+# --- Add project root to Python path, bots are loaded from the 'bots' folder of the working directory ---
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+os.chdir(project_root)
+# ---
+
+from constants import *
+from bots.aggro_bot import AggroBot
+from modules.game_config import GameConfig
+from modules.map_generator import generate_map
+from modules.food_generator import generate_food
+from modules.bot_operations import generate_bot_positions, load_bots, get_minimaps, move_bots
+
+# --- Benchmark Parameters ---
+BOARD_SIZES = [40, 100]
+BOT_COUNTS = [8, 32]
+NUM_TICKS = 300
+NUM_GAMES = 3
+MOUNTAIN_SHARE = 200 / (40 * 40)    # Share of the board covered by mountains in the standard game
+# ---
+
+def run_case(size: int, num_bots: int, ticks: int, games: int, seed: int) -> dict:
+    """
+    Play the games of one benchmark case and return its measurements.
+    :param size: Number of rows and columns of the board
+    :param num_bots: Number of bots in every game
+    :param ticks: Maximum number of ticks of a game
+    :param games: Number of games to play, game i is played with seed + i
+    :param seed: Seed of the first game
+    """
+    config = GameConfig(rows=size, cols=size, number_of_bots=num_bots, mountain_coverage=int(size * size * MOUNTAIN_SHARE))
+    move_time = 0.0
+    num_moves = 0
+    checksum = 0
+    for game in range(games):
+        rng = random.Random(seed + game)
+        game_map = generate_map(**config.map_params(), rng=rng)
+        bot_positions = generate_bot_positions(game_map, num_bots, rng)
+        bots, _ = load_bots(bot_positions, game_map, [AggroBot], rng)
+        bot_food = {id: 1 for id in bot_positions.keys()}
+        bot_ids = {id: BOT_ALIVE for id in bot_positions.keys()}
+        total_cells = game_map.rows * game_map.cols
+        minimaps = {}
+
+        for _ in range(ticks):
+            bot_directions = {}
+            for id, minimap in get_minimaps(game_map, bot_positions, bot_ids, minimaps).items():
+                x, y = bot_positions[id]
+                start = time.perf_counter()
+                bot_directions[id] = bots[id].move(current_x=x, current_y=y, minimap=minimap, bot_food=bot_food)
+                move_time += time.perf_counter() - start
+            num_moves += len(bot_directions)
+            checksum = zlib.crc32(bytes(bot_directions[id] for id in sorted(bot_directions)), checksum)
+            move_bots(game_map, bot_ids, bot_positions, bot_directions, bot_food)
+            num_alive_bots = sum(1 for i in bot_ids.values() if i == BOT_ALIVE)
+            if num_alive_bots <= 1:
+                break
+            if game_map.food_count / total_cells < config.max_food_percentage:
+                generate_food(game_map, num_alive_bots * config.food_generation_quantity_per_bot, rng)
+
+    return {
+        "size": size,
+        "bots": num_bots,
+        "moves": num_moves,
+        "us_per_move": move_time / num_moves * 1e6 if num_moves else 0.0,
+        "checksum": checksum,
+    }
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Measure the time of AggroBot.move() on growing boards and bot counts.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=BOARD_SIZES, help="Board sizes (rows = cols) to measure")
+    parser.add_argument("--bots", type=int, nargs="+", default=BOT_COUNTS, help="Bot counts to measure")
+    parser.add_argument("--ticks", type=int, default=NUM_TICKS, help="Maximum ticks of every game")
+    parser.add_argument("--games", type=int, default=NUM_GAMES, help="Games to play in every case")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the first game of every case")
+    return parser.parse_args()
+
+if __name__ == "__main__":
+    args = parse_args()
+    print(f"{'board':>11} {'bots':>5} {'moves':>8} {'us/move':>9} {'checksum':>10}")
+    for size in args.sizes:
+        for num_bots in args.bots:
+            result = run_case(size, num_bots, args.ticks, args.games, args.seed)
+            print(f"{size:>5}x{size:<5} {num_bots:>5} {result['moves']:>8} {result['us_per_move']:>9.1f} {result['checksum']:>10}")
+
+# --- END OF FILE bench_aggro_bot.py ---
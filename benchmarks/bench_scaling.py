@@ -0,0 +1,153 @@
+# --- START OF FILE bench_scaling.py ---
+"""
+Scaling benchmark for the game engine.
+
+Plays a fixed number of ticks on growing boards with growing numbers of bots and reports
+the map generation time, the ticks per second and the peak RSS of every case. Each case runs
+in its own process so that the peak RSS of one case does not leak into the next.
+
+Usage:
+    python benchmarks/bench_scaling.py
+    python benchmarks/bench_scaling.py --sizes 40 200 --bots 4 64 --ticks 200 --bot-class BasicBot2
+"""
+
+import argparse
+import json
+import os
+import random
+import resource
+import subprocess
+import sys
+import time
+
+# --- Add project root to Python path, bots are loaded from the 'bots' folder of the working directory ---
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+os.chdir(project_root)
+# ---
+
+from constants import *
+from bots.bot import Bot
+from modules.game_config import GameConfig
+from modules.map_generator import generate_map
+from modules.food_generator import generate_food
+from modules.bot_operations import get_number_of_bots, generate_bot_positions, load_bots, calculate_bot_directions, move_bots
+from modules.vector_resolver import move_bots_vectorized
+
+# --- Benchmark Parameters ---
+BOARD_SIZES = [40, 200, 500, 1000]
+BOT_COUNTS = [4, 64, 512]
+NUM_TICKS = 100
+MOUNTAIN_SHARE = 200 / (40 * 40)    # Share of the board covered by mountains in the standard game
+# ---
+
+def run_case(size: int, num_bots: int, ticks: int, bot_class: str, seed: int, vectorized_moves: bool = False) -> dict:
+    """
+    Play one benchmark case in this process and return its measurements.
+    :param size: Number of rows and columns of the board
+    :param num_bots: Number of bots in the game
+    :param ticks: Number of ticks to play
+    :param bot_class: Name of the only bot class to play, all bot classes if None
+    :param seed: Seed of the game
+    :param vectorized_moves: Resolve the moves with move_bots_vectorized() instead of move_bots()
+    """
+    rng = random.Random(seed)
+    random.seed(seed)
+    config = GameConfig(rows=size, cols=size, number_of_bots=num_bots, mountain_coverage=int(size * size * MOUNTAIN_SHARE),
+                        vectorized_moves=vectorized_moves)
+    resolve_moves = move_bots_vectorized if config.vectorized_moves else move_bots
+
+    start = time.perf_counter()
+    game_map = generate_map(**config.map_params(), rng=rng)
+    map_time = time.perf_counter() - start
+
+    get_number_of_bots()
+    bot_classes = [c for c in Bot.__subclasses__() if bot_class is None or c.__name__ == bot_class]
+    if not bot_classes:
+        raise ValueError(f"No bot class named {bot_class}")
+
+    start = time.perf_counter()
+    bot_positions = generate_bot_positions(game_map, num_bots, rng)
+    bots, _ = load_bots(bot_positions, game_map, bot_classes, rng)
+    bot_food = {id: 1 for id in bot_positions.keys()}
+    bot_ids = {id: BOT_ALIVE for id in bot_positions.keys()}
+    setup_time = time.perf_counter() - start
+
+    total_cells = game_map.rows * game_map.cols
+    minimaps = {}
+    ticks_played = 0
+    start = time.perf_counter()
+    while ticks_played < ticks:
+        bot_directions = calculate_bot_directions(game_map, bots, bot_positions, bot_ids, bot_food, minimaps)
+        resolve_moves(game_map, bot_ids, bot_positions, bot_directions, bot_food)
+        ticks_played += 1
+        num_alive_bots = sum(1 for i in bot_ids.values() if i == BOT_ALIVE)
+        if num_alive_bots <= 1:
+            break
+        if game_map.food_count / total_cells < config.max_food_percentage:
+            generate_food(game_map, num_alive_bots * config.food_generation_quantity_per_bot, rng)
+    tick_time = time.perf_counter() - start
+
+    return {
+        "size": size,
+        "bots": num_bots,
+        "ticks": ticks_played,
+        "map_seconds": map_time,
+        "setup_seconds": setup_time,
+        "ticks_per_second": ticks_played / tick_time if tick_time > 0 else float("inf"),
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,   # ru_maxrss is in KB on Linux
+    }
+
+def run_case_in_subprocess(size: int, num_bots: int, ticks: int, bot_class: str, seed: int, vectorized_moves: bool = False) -> dict:
+    """
+    Run one case in a fresh interpreter and return its measurements, or None if it failed.
+    """
+    command = [sys.executable, os.path.abspath(__file__), "--case", str(size), str(num_bots),
+               "--ticks", str(ticks), "--seed", str(seed)]
+    if bot_class is not None:
+        command += ["--bot-class", bot_class]
+    if vectorized_moves:
+        command.append("--vectorized-moves")
+    completed = subprocess.run(command, capture_output=True, text=True)
+    if completed.returncode != 0:
+        print(f"\n!!! Case {size}x{size} with {num_bots} bots failed !!!\n{completed.stderr}")
+        return None
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Measure engine ticks/sec and peak RSS for growing boards and bot counts.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=BOARD_SIZES, help="Board sizes (rows = cols) to measure")
+    parser.add_argument("--bots", type=int, nargs="+", default=BOT_COUNTS, help="Bot counts to measure")
+    parser.add_argument("--ticks", type=int, default=NUM_TICKS, help="Ticks to play in every case")
+    parser.add_argument("--bot-class", default=None, help="Only play this bot class (default: all bot classes in turn)")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of every case")
+    parser.add_argument("--vectorized-moves", action="store_true", help="Resolve the moves with the NumPy resolver")
+    parser.add_argument("--json", default=None, help="Also write the results to this JSON file")
+    parser.add_argument("--case", type=int, nargs=2, default=None, metavar=("SIZE", "BOTS"), help=argparse.SUPPRESS)
+    return parser.parse_args()
+
+if __name__ == "__main__":
+    args = parse_args()
+
+    # Child process: run one case and print its result as JSON
+    if args.case is not None:
+        print(json.dumps(run_case(args.case[0], args.case[1], args.ticks, args.bot_class, args.seed, args.vectorized_moves)))
+        sys.exit(0)
+
+    print(f"{'board':>11} {'bots':>5} {'ticks':>6} {'map s':>8} {'setup s':>8} {'ticks/s':>10} {'peak MB':>9}")
+    results = []
+    for size in args.sizes:
+        for num_bots in args.bots:
+            result = run_case_in_subprocess(size, num_bots, args.ticks, args.bot_class, args.seed, args.vectorized_moves)
+            if result is None:
+                continue
+            results.append(result)
+            print(f"{size:>5}x{size:<5} {num_bots:>5} {result['ticks']:>6} {result['map_seconds']:>8.2f} "
+                  f"{result['setup_seconds']:>8.2f} {result['ticks_per_second']:>10.1f} {result['peak_rss_mb']:>9.1f}")
+
+    if args.json is not None:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+# --- END OF FILE bench_scaling.py ---
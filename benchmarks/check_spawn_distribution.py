@@ -0,0 +1,130 @@
+# --- START OF FILE check_spawn_distribution.py ---
+"""
+Check that spawning from the free cell index (GameMap.free_cells) gives the same distribution
+as the rejection sampler the engine used before it.
+
+On a seeded map with a few bots, food and bots are spawned over many seeded trials, both with
+generate_food() / generate_bot_positions() and with the old loop that draws random cells until
+one is walkable. Every spawn must land on a distinct free cell, and a two-sample chi-square test
+over the cells must not tell the two samplers apart. Exits with status 1 otherwise.
+
+Usage:
+    python benchmarks/check_spawn_distribution.py
+    python benchmarks/check_spawn_distribution.py --trials 5000 --seed 3
+"""
+
+import argparse
+import math
+import os
+import random
+import sys
+from collections import Counter
+
+# --- Add project root to Python path ---
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+# ---
+
+from constants import *
+from modules.game_config import GameConfig
+from modules.map_generator import generate_map
+from modules.food_generator import generate_food
+from modules.bot_operations import generate_bot_positions
+
+# --- Check Parameters ---
+NUM_TRIALS = 2000
+BOARD_SIZE = 20             # Small board, so that every cell is drawn often
+MOUNTAIN_COVERAGE = 40
+NUM_BOTS = 6                # Bots standing on the board, their cells are not free
+FOOD_PER_TRIAL = 10         # Food spawned by every trial, bots spawned by every trial is NUM_BOTS
+MAX_Z_SCORE = 3.29          # Chi-square statistics above this normal score (p < 0.0005) fail the check
+# ---
+
+def rejection_spawn(rows: list, quantity: int, cell: str, rng: random.Random) -> list:
+    """
+    The old sampler: draw random cells until one is walkable, then put the cell there
+    :param rows: 2D list representing the game map, updated in place
+    :param quantity: Number of cells to spawn
+    :param cell: Cell to put on the spawned cells
+    :param rng: Random generator of the trial
+    :return: flat indices of the spawned cells
+    """
+    length, breadth = len(rows), len(rows[0])
+    spawned = []
+    for _ in range(quantity):
+        while True:
+            x, y = rng.randint(0, length - 1), rng.randint(0, breadth - 1)
+            if rows[x][y] == WALKABLE_CELL:
+                rows[x][y] = cell
+                spawned.append(x * breadth + y)
+                break
+    return spawned
+
+def food_spawns(game_map, rng: random.Random) -> list:
+    return generate_food(game_map, FOOD_PER_TRIAL, rng)
+
+def bot_spawns(game_map, rng: random.Random) -> list:
+    return [x * game_map.cols + y for x, y in generate_bot_positions(game_map, NUM_BOTS, rng).values()]
+
+def chi_square_z(counts: Counter, reference_counts: Counter) -> float:
+    """
+    Normal score of the two-sample chi-square statistic of two samples over the same cells
+    (Wilson-Hilferty approximation of the chi-square distribution)
+    """
+    total, reference_total = sum(counts.values()), sum(reference_counts.values())
+    statistic = 0.0
+    cells = counts.keys() | reference_counts.keys()
+    for k in cells:
+        both = counts[k] + reference_counts[k]
+        expected = both * total / (total + reference_total)
+        reference_expected = both * reference_total / (total + reference_total)
+        statistic += (counts[k] - expected) ** 2 / expected + (reference_counts[k] - reference_expected) ** 2 / reference_expected
+    df = max(len(cells) - 1, 1)
+    return ((statistic / df) ** (1 / 3) - (1 - 2 / (9 * df))) / math.sqrt(2 / (9 * df))
+
+def check_sampler(name: str, spawn, quantity: int, cell: str, trials: int, seed: int) -> bool:
+    """
+    Compare a spawn function of the engine with the rejection sampler and print the result
+    :param name: Name of the spawn function
+    :param spawn: Function of (map, rng) spawning on the map, returns the flat indices of the spawned cells
+    :param quantity: Number of cells spawn() spawns
+    :param cell: Cell spawn() puts on the spawned cells
+    :param trials: Number of seeded trials
+    :param seed: Seed of the map, trial i is played with seed + i
+    :return: True if the samplers agree
+    """
+    config = GameConfig(rows=BOARD_SIZE, cols=BOARD_SIZE, mountain_coverage=MOUNTAIN_COVERAGE)
+    game_map = generate_map(**config.map_params(), rng=random.Random(seed))
+    generate_bot_positions(game_map, NUM_BOTS, random.Random(seed))
+    free = set(game_map.free_cells.cells)
+
+    counts, reference_counts = Counter(), Counter()
+    for trial in range(trials):
+        spawned = spawn(game_map.copy(), random.Random(seed + trial))
+        if len(spawned) != quantity or len(set(spawned)) != quantity or not free.issuperset(spawned):
+            print(f"{name}: trial {trial} did not spawn {quantity} distinct free cells")
+            return False
+        counts.update(spawned)
+        reference_counts.update(rejection_spawn(game_map.to_rows(), quantity, cell, random.Random(seed + trial)))
+
+    z = chi_square_z(counts, reference_counts)
+    print(f"{name}: {trials * quantity} spawns over {len(free)} free cells, chi-square z = {z:.2f}")
+    return z <= MAX_Z_SCORE
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Check that food and bots spawn with the same distribution as the rejection sampler.")
+    parser.add_argument("--trials", type=int, default=NUM_TRIALS, help="Number of seeded trials of every sampler")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the map, trial i is played with seed + i")
+    return parser.parse_args()
+
+if __name__ == "__main__":
+    args = parse_args()
+    agree = check_sampler("generate_food", food_spawns, FOOD_PER_TRIAL, FOOD_CELL, args.trials, args.seed)
+    agree = check_sampler("generate_bot_positions", bot_spawns, NUM_BOTS, PLAYER_CELL, args.trials, args.seed) and agree
+    if not agree:
+        print("The spawn distribution changed.")
+        sys.exit(1)
+    print("Spawns follow the same distribution as the rejection sampler.")
+
+# --- END OF FILE check_spawn_distribution.py ---
@@ -0,0 +1,133 @@
+# --- START OF FILE check_vector_resolver.py ---
+"""
+Differential check of move_bots_vectorized() against move_bots().
+
+Plays random directions for a few ticks on random bordered boards crowded with bots of close
+food counts (so that swaps, cell fights and ties happen often), once with move_bots() and once
+with move_bots_vectorized() (with and without the passable neighbour table). After every tick
+the terrain, the occupancy, the food count, the order of the free cells (which decides where
+food spawns next), bot_ids, the positions and the food of the bots must be the same.
+Exits with status 1 on the first difference.
+
+Usage:
+    python benchmarks/check_vector_resolver.py
+    python benchmarks/check_vector_resolver.py --boards 10000 --seed 3
+"""
+
+import argparse
+import os
+import random
+import sys
+
+# --- Add project root to Python path ---
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+# ---
+
+from constants import *
+from modules.game_map import GameMap
+from modules.bot_operations import move_bots
+from modules.neighbors import passable_neighbors
+from modules.vector_resolver import move_bots_vectorized
+
+# --- Check Parameters ---
+NUM_BOARDS = 3000
+TICKS_PER_BOARD = 5
+MIN_SIZE = 5                # Smallest number of rows / cols of a board, border included
+MAX_SIZE = 24               # Largest number of rows / cols of a board, border included
+BORDER = 2                  # Out of bounds layers around the board, like generate_random_shaped_map()
+CELL_WEIGHTS = {            # Share of every cell inside the border
+    WALKABLE_CELL: 0.6,
+    FOOD_CELL: 0.2,
+    MOUNTAIN_CELL: 0.15,
+    OUT_OF_BOUNDS_CELL: 0.05,
+}
+MAX_START_FOOD = 4          # Bots start with 1 to this much food, so equal food counts are common
+# ---
+
+def random_board(rng: random.Random) -> tuple:
+    """
+    Random bordered board with bots on up to half of its free cells
+    :param rng: Random generator of the board
+    :return: (map, bot_ids, bot_positions, bot_food)
+    """
+    rows, cols = rng.randint(MIN_SIZE, MAX_SIZE), rng.randint(MIN_SIZE, MAX_SIZE)
+    cells, weights = list(CELL_WEIGHTS), list(CELL_WEIGHTS.values())
+    terrain = bytearray(rows * cols)
+    for i in range(rows):
+        for j in range(cols):
+            inside = BORDER <= i < rows - BORDER and BORDER <= j < cols - BORDER
+            cell = rng.choices(cells, weights)[0] if inside else OUT_OF_BOUNDS_CELL
+            terrain[i * cols + j] = CELL_CODES[cell]
+    game_map = GameMap(rows, cols, terrain)
+
+    num_bots = rng.randint(0, game_map.free_count // 2)
+    bot_ids, bot_positions, bot_food = {}, {}, {}
+    for id in range(1, num_bots + 1):
+        k = game_map.free_cells.choice(rng)
+        game_map.occupy(k, id)
+        bot_ids[id] = BOT_ALIVE
+        bot_positions[id] = list(divmod(k, cols))
+        bot_food[id] = rng.randint(1, MAX_START_FOOD)
+    return game_map, bot_ids, bot_positions, bot_food
+
+def snapshot(game_map: GameMap, bot_ids: dict, bot_positions: dict, bot_food: dict) -> dict:
+    """
+    Everything a resolver may change, in comparable form
+    """
+    return {
+        "terrain": bytes(game_map.terrain),
+        "occupancy": game_map.occupancy.tobytes(),
+        "food_count": game_map.food_count,
+        "free_cells": game_map.free_cells.cells.tobytes(),
+        "bot_ids": dict(bot_ids),
+        "positions": {id: list(position) for id, position in bot_positions.items()},
+        "food": dict(bot_food),
+    }
+
+def check_board(rng: random.Random) -> str:
+    """
+    Play one random board with every resolver
+    :param rng: Random generator of the board and the directions
+    :return: description of the first difference, None if the resolvers agree
+    """
+    game_map, bot_ids, bot_positions, bot_food = random_board(rng)
+    neighbors = passable_neighbors(game_map)
+    resolvers = {
+        "move_bots_vectorized": move_bots_vectorized,
+        "move_bots_vectorized(neighbors)": lambda *state: move_bots_vectorized(*state, neighbors=neighbors),
+    }
+    states = {"move_bots": (game_map, bot_ids, bot_positions, bot_food)}
+    for name in resolvers:
+        states[name] = (game_map.copy(), dict(bot_ids), {id: list(p) for id, p in bot_positions.items()}, dict(bot_food))
+
+    for tick in range(1, TICKS_PER_BOARD + 1):
+        bot_directions = {id: rng.choice(list(MOVEMENTS)) for id, status in bot_ids.items() if status == BOT_ALIVE}
+        move_bots(*states["move_bots"][:3], bot_directions, states["move_bots"][3])
+        expected = snapshot(*states["move_bots"])
+        for name, resolve in resolvers.items():
+            map_copy, ids, positions, food = states[name]
+            resolve(map_copy, ids, positions, bot_directions, food)
+            actual = snapshot(map_copy, ids, positions, food)
+            for key in expected:
+                if actual[key] != expected[key]:
+                    return f"{name} differs from move_bots in {key} after tick {tick}"
+    return None
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Check that move_bots_vectorized() gives the same results as move_bots().")
+    parser.add_argument("--boards", type=int, default=NUM_BOARDS, help="Number of random boards to play")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the first board, board i is played with seed + i")
+    return parser.parse_args()
+
+if __name__ == "__main__":
+    args = parse_args()
+    for board in range(args.boards):
+        difference = check_board(random.Random(args.seed + board))
+        if difference is not None:
+            print(f"Board with seed {args.seed + board}: {difference}")
+            sys.exit(1)
+    print(f"move_bots_vectorized() matches move_bots() on {args.boards} boards of {TICKS_PER_BOARD} ticks.")
+
+# --- END OF FILE check_vector_resolver.py ---
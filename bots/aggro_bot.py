@@ -1,17 +1,45 @@
-import random
-from collections import deque
+from array import array
 from bots.bot import Bot
+from bots.nav import NavField
 from constants import *
 
+# Half the side of the square around a food target whose food counts towards its score
+DENSITY_RADIUS = 2
+
 class AggroBot(Bot):
+    compact_map = True  # self.map is a KnownMap, searched by self.nav
+
     def __init__(self, id: int, start_x: int, start_y: int, minimap: list, map_length: int, map_breadth: int):
         super().__init__(id, start_x, start_y, minimap, map_length, map_breadth)
         self.move_history = [] 
         self.last_position = None
+        rows, cols = self.map.rows, self.map.cols
+        self.nav = NavField(self.map)   # Target searches over the known map, see bots/nav.py
+        # Known food in the (2 * DENSITY_RADIUS + 1) square around every cell, kept up to date from self.map_changes
+        self.food_density = array('B', bytes(rows * cols))
+        self._update_food_density()
+        self._passable_bots = set()     # Bots the searches can walk through this move
+        self._killable_bots = set()     # Bots weaker than this one this move
+
+    def _update_food_density(self):
+        density, rows, cols = self.food_density, self.map.rows, self.map.cols
+        for x, y, old, new in self.map_changes:
+            delta = (new == FOOD_CELL) - (old == FOOD_CELL)
+            if delta:
+                for i in range(max(0, x - DENSITY_RADIUS), min(rows, x + DENSITY_RADIUS + 1)):
+                    for k in range(i * cols + max(0, y - DENSITY_RADIUS), i * cols + min(cols, y + DENSITY_RADIUS + 1)):
+                        density[k] += delta
 
     def move(self, current_x: int, current_y: int, minimap: list, bot_food: dict) -> int:
         self.update_state(current_x, current_y, minimap, bot_food)
-        
+        self._update_food_density()
+        self.nav.update(self.x, self.y, self.map_changes)
+        my_food = self.bot_food.get(self.id, 1)
+        self._passable_bots = {bot_id for bot_id, food_count in self.bot_food.items()
+                               if food_count <= my_food and bot_id != self.id}
+        self._killable_bots = {bot_id for bot_id, food_count in self.bot_food.items()
+                               if food_count < my_food and bot_id != self.id}
+
         self.last_position = (current_x, current_y)
         
         threat_move = self.avoid_threats()
@@ -35,7 +63,7 @@ class AggroBot(Bot):
         surrounded_by_food = True
         for dx, dy in MOVEMENTS.values():
             nx, ny = self.x + dx, self.y + dy
-            if self._in_bounds(nx, ny) and self.map[nx][ny] != FOOD_CELL:
+            if self._in_bounds(nx, ny) and self.map.get(nx, ny) != FOOD_CELL:
                 surrounded_by_food = False
                 break
 
@@ -77,7 +105,7 @@ class AggroBot(Bot):
         for dir_constant, (nx, ny) in directions.items():
             if not self._in_bounds(nx, ny):
                 continue
-            cell_val = self.map[nx][ny]
+            cell_val = self.map.get(nx, ny)
             if cell_val not in [WALKABLE_CELL, FOOD_CELL, MOUNTAIN_CELL, OUT_OF_BOUNDS_CELL, UNKNOWN_CELL]:
                 try:
                     other_bot_id = int(cell_val)
@@ -109,12 +137,12 @@ class AggroBot(Bot):
         for safe_dir in safe_dirs:
             dx, dy = MOVEMENTS[safe_dir]
             ex, ey = self.x + dx, self.y + dy
-            if self._in_bounds(ex, ey) and self.map[ex][ey] == FOOD_CELL:
+            if self._in_bounds(ex, ey) and self.map.get(ex, ey) == FOOD_CELL:
                 return safe_dir
 
         dx, dy = MOVEMENTS[escape_dir]
         ex, ey = self.x + dx, self.y + dy
-        if self._in_bounds(ex, ey) and self.map[ex][ey] in [WALKABLE_CELL, FOOD_CELL]:
+        if self._in_bounds(ex, ey) and self.map.get(ex, ey) in [WALKABLE_CELL, FOOD_CELL]:
             return escape_dir
 
         return safe_moves[0] if safe_moves else MOVE_HALT
@@ -131,7 +159,7 @@ class AggroBot(Bot):
                     if self._in_bounds(nx, ny) and (nx, ny) not in recent_positions:
                         available_moves.append(move)
                 if available_moves:
-                    return random.choice(available_moves)
+                    return self.rng.choice(available_moves)
 
         available_moves = []
         for move in [MOVE_UP, MOVE_DOWN, MOVE_LEFT, MOVE_RIGHT]:
@@ -139,17 +167,17 @@ class AggroBot(Bot):
             nx, ny = self.x + dx, self.y + dy
             if not self._in_bounds(nx, ny):
                 continue
-            if self.map[nx][ny] in [WALKABLE_CELL, FOOD_CELL]:
+            if self.map.get(nx, ny) in [WALKABLE_CELL, FOOD_CELL]:
                 if self.last_position and (nx, ny) != self.last_position:
                     available_moves.append(move)
 
         if available_moves:
-            return random.choice(available_moves)
+            return self.rng.choice(available_moves)
 
         valid_moves = [move for move in [MOVE_UP, MOVE_DOWN, MOVE_LEFT, MOVE_RIGHT]
                       if self._in_bounds(self.x + MOVEMENTS[move][0], 
                                        self.y + MOVEMENTS[move][1])]
-        return random.choice(valid_moves) if valid_moves else MOVE_UP
+        return self.rng.choice(valid_moves) if valid_moves else MOVE_UP
 
     def _get_exploration_move(self, force_explore=False) -> int:
         if len(self.move_history) < 4 and not force_explore:
@@ -167,116 +195,71 @@ class AggroBot(Bot):
             nx, ny = self.x + dx, self.y + dy
             if not self._in_bounds(nx, ny):
                 continue
-            if self.map[nx][ny] not in [MOUNTAIN_CELL, OUT_OF_BOUNDS_CELL, UNKNOWN_CELL]:
+            if self.map.get(nx, ny) not in [MOUNTAIN_CELL, OUT_OF_BOUNDS_CELL, UNKNOWN_CELL]:
                 position_penalty = 2 if (nx, ny) in recent_positions else 0
                 distance = ((nx - center_x) ** 2 + (ny - center_y) ** 2) ** 0.5 - position_penalty
                 if distance > max_distance:
                     max_distance = distance
                     best_move = move
 
-        return best_move if best_move is not None else random.choice(list(MOVEMENTS.keys()))
+        return best_move if best_move is not None else self.rng.choice(list(MOVEMENTS.keys()))
 
     def bfs_for_weaker_bot(self, extended_range=False):
-        my_food = self.bot_food.get(self.id, 1)
         max_depth = 15 if extended_range else 5
-        return self._bfs_for_target(
-            is_target_fn=lambda cell_val: self._is_killable_bot(cell_val, my_food),
-            max_depth=max_depth
-        )
+        return self._bfs_for_target(target_bots=self._killable_bots, max_depth=max_depth)
 
     def bfs_for_food(self):
-        def calculate_food_density(x, y):
-            density = 0
-            for dx in [-2, -1, 0, 1, 2]:
-                for dy in [-2, -1, 0, 1, 2]:
-                    nx, ny = x + dx, y + dy
-                    if self._in_bounds(nx, ny) and self.map[nx][ny] == FOOD_CELL:
-                        density += 1
-            return density
-
-        return self._bfs_for_target(
-            is_target_fn=lambda cell_val: (cell_val == FOOD_CELL),
-            score_fn=calculate_food_density
-        )
-
-    def _bfs_for_target(self, is_target_fn, score_fn=None, max_depth=5):
-        visited = set()
-        queue = deque()
-        queue.append((self.x, self.y, None, 0))
-        visited.add((self.x, self.y))
-        targets = []
-
-        while queue:
-            cx, cy, first_dir, depth = queue.popleft()
-            if depth > max_depth:
-                continue
-
-            cell_val = self.map[cx][cy]
-
-            if is_target_fn(cell_val):
-                food_on_path = self._count_food_on_path(self.x, self.y, cx, cy)
-                score = (score_fn(cx, cy) if score_fn else 1) + food_on_path * 0.5
-                targets.append((cx, cy, first_dir, score))
-                continue
-
-            for d, (dx, dy) in MOVEMENTS.items():
-                nx, ny = cx + dx, cy + dy
-                if not self._in_bounds(nx, ny):
-                    continue
-                if (nx, ny) not in visited and self.map[nx][ny] in [WALKABLE_CELL, FOOD_CELL] + self._possible_bot_cells():
-                    visited.add((nx, ny))
-                    next_dir = first_dir if first_dir is not None else d
-                    queue.append((nx, ny, next_dir, depth + 1))
-
-        if targets:
-            best_target = max(targets, key=lambda t: t[3])
-            if best_target[2] is None:
+        return self._bfs_for_target(target_codes=(FOOD_CODE,), scores=self.food_density)
+
+    def _bfs_for_target(self, target_codes=(), target_bots=(), scores=None, max_depth=5):
+        """
+        Search the targets (cell codes or bot ids) up to max_depth steps with NavField.find(),
+        walking through the bots this one would not lose to. Every target is scored as
+        scores[flat index] (1 if scores is None) plus half the food on the straight line to it.
+        Returns the first move towards the best scored target (the first found on a tie), None if
+        no target was reached.
+        """
+        path_food = {self.nav.position: 0}
+        best, best_score = None, None
+        for k, first_dir in self.nav.find(target_codes, target_bots, self._passable_bots, max_depth):
+            score = (scores[k] if scores is not None else 1) + self._food_on_path(k, path_food) * 0.5
+            if best_score is None or score > best_score:
+                best, best_score = (k, first_dir), score
+
+        if best is not None:
+            if best[1] is None:
                 valid_dirs = []
                 for d, (dx, dy) in MOVEMENTS.items():
                     nx, ny = self.x + dx, self.y + dy
-                    if self._in_bounds(nx, ny) and self.map[nx][ny] in [WALKABLE_CELL, FOOD_CELL]:
+                    if self._in_bounds(nx, ny) and self.map.get(nx, ny) in [WALKABLE_CELL, FOOD_CELL]:
                         valid_dirs.append(d)
                 if valid_dirs:
-                    return random.choice(valid_dirs)
-            return best_target[2]
+                    return self.rng.choice(valid_dirs)
+            return best[1]
 
         return None
 
-    def _count_food_on_path(self, start_x, start_y, target_x, target_y):
-        food_count = 0
-        x, y = start_x, start_y
-        while x != target_x or y != target_y:
-            if x < target_x:
-                x += 1
-            elif x > target_x:
-                x -= 1
-            if y < target_y:
-                y += 1
-            elif y > target_y:
-                y -= 1
-            if self._in_bounds(x, y) and self.map[x][y] == FOOD_CELL:
-                food_count += 1
-        return food_count
+    def _food_on_path(self, target, path_food):
+        """
+        Food on the line from the bot to the flat index target, stepping diagonally until it is
+        level with the target. The line to a cell is the line to the cell one step before it plus
+        that cell, so the counts of a search are shared through path_food { flat index -> count }.
+        """
+        cols = self.map.cols
+        line = []
+        k = target
+        while k not in path_food:
+            line.append(k)
+            x, y = divmod(k, cols)
+            steps = max(abs(x - self.x), abs(y - self.y)) - 1
+            x = self.x + max(-steps, min(steps, x - self.x))
+            y = self.y + max(-steps, min(steps, y - self.y))
+            k = x * cols + y
+        count = path_food[k]
+        for k in reversed(line):
+            count += self.map.codes[k] == FOOD_CODE
+            path_food[k] = count
+        return count
 
     def _in_bounds(self, x, y) -> bool:
-        return 0 <= x < len(self.map) and 0 <= y < len(self.map[0])
-
-    def _is_killable_bot(self, cell_val, my_food):
-        if cell_val in [WALKABLE_CELL, FOOD_CELL, MOUNTAIN_CELL, OUT_OF_BOUNDS_CELL, UNKNOWN_CELL]:
-            return False
-        try:
-            other_bot_id = int(cell_val)
-            if other_bot_id == self.id:
-                return False
-            other_food = self.bot_food.get(other_bot_id, 1)
-            return (other_food < my_food)
-        except ValueError:
-            return False
-
-    def _possible_bot_cells(self):
-        my_food = self.bot_food.get(self.id, 1)
-        return [
-            str(bot_id) 
-            for bot_id, food_count in self.bot_food.items() 
-            if food_count <= my_food and bot_id != self.id
-        ]
+        return 0 <= x < self.map.rows and 0 <= y < self.map.cols
@@ -1,4 +1,3 @@
-import random
 from .bot import Bot
 from constants import *
 
@@ -8,7 +7,7 @@ class BasicBot1(Bot):
 
     def move(self, current_x:int, current_y:int, minimap:list, bot_food:dict) -> int:
         self.update_state(current_x, current_y, minimap, bot_food)
-        direction = random.randint(0, 4)
+        direction = self.rng.randint(0, 4)
         self.x = current_x
         self.y = current_y
         return direction
\ No newline at end of file
@@ -1,6 +1,5 @@
 from .bot import Bot
 from constants import *
-import random
 
 class BasicBot3(Bot):
     def __init__(self, id: int, start_x: int, start_y: int, minimap: list, map_length: int, map_breadth: int):
@@ -20,7 +19,7 @@ class BasicBot3(Bot):
         
         food_x, food_y = self.find_food()
         if food_x == None:
-            return random.randint(0, 4)
+            return self.rng.randint(0, 4)
         if food_x < self.x and self.map[self.x-1][self.y] in [FOOD_CELL, WALKABLE_CELL]:
             return MOVE_UP
         elif food_x > self.x and self.map[self.x+1][self.y] in [FOOD_CELL, WALKABLE_CELL]:
@@ -1,9 +1,137 @@
+import random
 from abc import ABC, abstractmethod
 from constants import *
 
+# Compact map of what a bot has seen so far
+class KnownMap:
+    """
+    One byte per cell (see CELL_CODES in constants.py, BOT_CODE where a bot was seen) and a
+    dictionary of the cells with a bot, instead of a list of lists of strings.
+
+    map[x][y] reads and writes the string cells like the list of lists, so bot code written
+    against it keeps working. is_walkable(), is_food() and bot_at() skip the string compares.
+    Coordinates are not bounds checked.
+    """
+    __slots__ = ('rows', 'cols', 'codes', 'bots')
+
+    def __init__(self, rows: int, cols: int):
+        """
+        Create a map of unknown cells
+        :param rows: Number of rows of the map
+        :param cols: Number of columns of the map
+        """
+        self.rows = rows
+        self.cols = cols
+        self.codes = bytearray([UNKNOWN_CODE]) * (rows * cols)
+        self.bots = {}  # { flat index -> bot id } of the cells last seen with a bot
+
+    def get(self, x: int, y: int) -> str:
+        k = x * self.cols + y
+        code = self.codes[k]
+        return str(self.bots[k]) if code == BOT_CODE else CODE_CELLS[code]
+
+    def set(self, x: int, y: int, cell: str):
+        k = x * self.cols + y
+        code = CELL_CODES.get(cell)
+        if code is None:
+            code = BOT_CODE
+            self.bots[k] = int(cell)
+        elif self.codes[k] == BOT_CODE:
+            del self.bots[k]
+        self.codes[k] = code
+
+    def is_walkable(self, x: int, y: int) -> bool:
+        """
+        True if (x, y) was last seen walkable or with food, and no bot on it
+        """
+        return self.codes[x * self.cols + y] <= FOOD_CODE
+
+    def is_food(self, x: int, y: int) -> bool:
+        return self.codes[x * self.cols + y] == FOOD_CODE
+
+    def bot_at(self, x: int, y: int):
+        """
+        Id of the bot last seen on (x, y), None if there was none
+        """
+        return self.bots.get(x * self.cols + y)
+
+    def update_from_minimap(self, x: int, y: int, minimap: list) -> list:
+        """
+        Write the minimap centered on (x, y), returns the changed cells as (x, y, old cell, new cell)
+        """
+        changes = []
+        half_size = len(minimap) // 2
+        for i, minimap_row in enumerate(minimap):
+            map_x = x - half_size + i
+            if not 0 <= map_x < self.rows:
+                continue
+            for j, cell in enumerate(minimap_row):
+                map_y = y - half_size + j
+                if 0 <= map_y < self.cols:
+                    old = self.get(map_x, map_y)
+                    if old != cell:
+                        changes.append((map_x, map_y, old, cell))
+                        self.set(map_x, map_y, cell)
+        return changes
+
+    # List of lists compatibility
+    def __len__(self):
+        return self.rows
+
+    def __getitem__(self, x: int):
+        if x < 0:
+            x += self.rows
+        if not 0 <= x < self.rows:
+            raise IndexError("map row index out of range")
+        return _KnownRow(self, x)
+
+    def __iter__(self):
+        for x in range(self.rows):
+            yield _KnownRow(self, x)
+
+# Row of a KnownMap that behaves like a list of string cells
+class _KnownRow:
+    __slots__ = ('_map', '_x')
+
+    def __init__(self, known_map: KnownMap, x: int):
+        self._map = known_map
+        self._x = x
+
+    def _index(self, y: int) -> int:
+        cols = self._map.cols
+        if y < 0:
+            y += cols
+        if not 0 <= y < cols:
+            raise IndexError("map column index out of range")
+        return y
+
+    def __len__(self):
+        return self._map.cols
+
+    def __getitem__(self, y):
+        if isinstance(y, slice):
+            return [self._map.get(self._x, j) for j in range(*y.indices(self._map.cols))]
+        return self._map.get(self._x, self._index(y))
+
+    def __setitem__(self, y, cell):
+        self._map.set(self._x, self._index(y), cell)
+
+    def __iter__(self):
+        for y in range(self._map.cols):
+            yield self._map.get(self._x, y)
+
+    def __eq__(self, other):
+        return list(self) == list(other)
+
+    def __repr__(self):
+        return repr(list(self))
+
 # Bot class that needs to be inherited by the bot implementation
 # (DO NOT CHANGE THIS, YOUR CHANGES WILL BE IGNORED IN THE COMPETITION)
 class Bot(ABC):
+    # Keep self.map as a KnownMap (one byte per cell) instead of a list of lists of strings
+    compact_map = False
+
     def __init__(self, id: int, start_x: int, start_y: int, minimap: list, map_length: int, map_breadth: int):
         """
         Initialize the bot with its ID, starting x and y coordinates, initial minimap and map dimensions
@@ -20,22 +148,40 @@ class Bot(ABC):
         self.y = start_y        # Bot y coordinate
         self.minimap = minimap  # Bot minimap
         self.bot_food = {}
+        # Random generator of the bot, use it instead of the random module so that games can be replayed.
+        # The game reseeds it right after creating the bot, so it should not be used in __init__.
+        self.rng = random.Random()
+        # Cells of self.map changed by the last minimap, as (x, y, old cell, new cell) in minimap order.
+        # Food that appeared or got eaten and bots that came or left show up here, so caches built on
+        # self.map can be updated from these changes instead of rescanning.
+        self.map_changes = []
 
         # Initally bot doesnt know the map, so think that entire map is unknown
-        self.map = [[UNKNOWN_CELL for _ in range(map_breadth)] for _ in range(map_length)]
+        if self.compact_map:
+            self.map = KnownMap(map_length, map_breadth)
+        else:
+            self.map = [[UNKNOWN_CELL for _ in range(map_breadth)] for _ in range(map_length)]
         self.update_map_from_minimap()
 
     def update_map_from_minimap(self):
         """
-        Update the bot's map from the minimap
+        Update the bot's map from the minimap, recording the changed cells in self.map_changes
         """
+        if isinstance(self.map, KnownMap):
+            self.map_changes = self.map.update_from_minimap(self.x, self.y, self.minimap)
+            return
+        changes = self.map_changes = []
         half_size = len(self.minimap) // 2
         for i in range(len(self.minimap)):
-            for j in range(len(self.minimap[0])):
-                map_x = self.x - half_size + i
+            map_x = self.x - half_size + i
+            if not 0 <= map_x < len(self.map):
+                continue
+            row = self.map[map_x]
+            for j, cell in enumerate(self.minimap[i]):
                 map_y = self.y - half_size + j
-                if 0 <= map_x < len(self.map) and 0 <= map_y < len(self.map[0]):
-                    self.map[map_x][map_y] = self.minimap[i][j]
+                if 0 <= map_y < len(row) and row[map_y] != cell:
+                    changes.append((map_x, map_y, row[map_y], cell))
+                    row[map_y] = cell
 
     def update_state(self, current_x: int, current_y: int, minimap: list, bot_food: dict):
         """
@@ -1,6 +1,5 @@
 # --- START OF FILE debtanu_bot.py ---
 
-import random
 from collections import deque
 import sys
 import math # Needed for distance calculation
@@ -8,6 +7,7 @@ import math # Needed for distance calculation
 # --- Attempt to import Bot and constants ---
 try:
     from bots.bot import Bot
+    from bots.nav import NavField
     from constants import *
 except ImportError as e:
      print(f"Import Warning/Error: {e}. Attempting relative import.", file=sys.stderr)
@@ -19,7 +19,7 @@ except ImportError as e:
           MOVE_UP, MOVE_DOWN, MOVE_LEFT, MOVE_RIGHT, MOVE_HALT = 0, 1, 2, 3, 4
           MOVEMENTS = {MOVE_UP: (-1, 0), MOVE_DOWN: (1, 0), MOVE_LEFT: (0, -1), MOVE_RIGHT: (0, 1), MOVE_HALT: (0, 0)}
           WALKABLE_CELL, FOOD_CELL, MOUNTAIN_CELL, OUT_OF_BOUNDS_CELL, UNKNOWN_CELL = 'G', 'F', 'O', 'R', 'U'
-     try: from bot import Bot
+     try: from bot import Bot; from nav import NavField
      except ImportError:
          print("FATAL: Could not import base Bot class.", file=sys.stderr)
          sys.exit(1)
@@ -54,6 +54,7 @@ def debug_print(*args, **kwargs):
 # ===============================================
 class DebtanuBot(Bot):
 # ===============================================
+    compact_map = True # self.map is a KnownMap, see bots/bot.py
 
     # --- __init__ METHOD ---
     def __init__(self, id: int, start_x: int, start_y: int, minimap: list, map_length: int, map_breadth: int):
@@ -65,6 +66,8 @@ class DebtanuBot(Bot):
         self.stuck_turns = 0
         self.last_move_action = None
         self.turn_counter = 0 # NEW: Initialize turn counter
+        self.nav = NavField(self.map, max_depth=DEFAULT_BFS_DEPTH, rng=self.rng) # Shared BFS of this turn, see bots/nav.py
+        self.nav.update(start_x, start_y, self.map_changes)
         debug_print(f"Bot {self.id} initialized at ({start_x}, {start_y}). Early game limit: {EARLY_GAME_TURN_LIMIT} turns.")
         try:
              debug_print(f"  Map Size stored in bot: ({self.map_length}, {self.map_breadth})")
@@ -82,6 +85,7 @@ class DebtanuBot(Bot):
         except Exception as e:
             debug_print(f"!!!!!!!! Bot {self.id} Turn {self.turn_counter}: ERROR during self.update_state !!!!!!!! {e}")
             return MOVE_HALT
+        self.nav.update(self.x, self.y, self.map_changes)
 
         # --- Add position history ---
         try: self.position_history.append((self.x, self.y))
@@ -213,7 +217,7 @@ class DebtanuBot(Bot):
         except Exception as e: debug_print(f"  Error printing debug map view: {e}")
         debug_print("-" * 20)
 
-    # --- (Keep all other helper methods unchanged: _get_distance_sq, _get_centroid, _get_exploration_move, _get_random_safe_move, _is_safe_cell, _parse_bot_id, _find_escape_move, _find_hunt_move, _find_food_move, _get_perimeter_patrol_move, _is_stuck, _bfs, _in_bounds) ---
+    # --- (Keep all other helper methods unchanged: _get_distance_sq, _get_centroid, _get_exploration_move, _get_random_safe_move, _is_safe_cell, _parse_bot_id, _find_escape_move, _find_hunt_move, _find_food_move, _get_perimeter_patrol_move, _is_stuck, _nav_move, _in_bounds) ---
     # Make sure the _find_hunt_move uses the HUNT_SCORE_DIFFERENCE constant correctly.
     # Make sure _get_exploration_move and _get_random_safe_move use self.last_move_action correctly.
 
@@ -250,7 +254,7 @@ class DebtanuBot(Bot):
                 centroid_x, centroid_y = centroid; debug_print(f"  Centroid: ({centroid_x:.2f}, {centroid_y:.2f})")
                 opposite_last = OPPOSITE_MOVE.get(self.last_move_action); preferred = []; opposite_option = None
                 max_dist_sq = -1; best_preferred = -1; max_dist_sq_opp = -1
-                random.shuffle(safe_moves_data)
+                self.rng.shuffle(safe_moves_data)
                 for direction, nx, ny in safe_moves_data:
                     dist_sq = self._get_distance_sq(nx, ny, centroid_x, centroid_y)
                     if direction == opposite_last:
@@ -277,8 +281,8 @@ class DebtanuBot(Bot):
             else:
                 if not is_opposite: preferred_old.append(direction)
                 else: opposite_old = direction
-        if preferred_new: chosen = random.choice(preferred_new); debug_print(f"  Normal choice: Move {chosen} (preferred, new)"); return chosen
-        elif preferred_old: chosen = random.choice(preferred_old); debug_print(f"  Normal choice: Move {chosen} (preferred, old)"); return chosen
+        if preferred_new: chosen = self.rng.choice(preferred_new); debug_print(f"  Normal choice: Move {chosen} (preferred, new)"); return chosen
+        elif preferred_old: chosen = self.rng.choice(preferred_old); debug_print(f"  Normal choice: Move {chosen} (preferred, old)"); return chosen
         elif opposite_new is not None: debug_print(f"  Normal choice: Move {opposite_new} (opposite, new)"); return opposite_new
         elif opposite_old is not None: debug_print(f"  Normal choice: Move {opposite_old} (opposite, old)"); return opposite_old
         debug_print("  Exploration fallback: No suitable move found."); return None
@@ -294,13 +298,13 @@ class DebtanuBot(Bot):
         if not safe_moves: debug_print(f"Bot {self.id} at ({current_x}, {current_y}): No safe fallback moves. Halting."); return MOVE_HALT
         opposite_last = OPPOSITE_MOVE.get(self.last_move_action)
         preferred = [m for m in safe_moves if m != opposite_last]
-        if preferred: return random.choice(preferred)
-        elif safe_moves: return random.choice(safe_moves)
+        if preferred: return self.rng.choice(preferred)
+        elif safe_moves: return self.rng.choice(safe_moves)
         else: debug_print(f"Bot {self.id} at ({current_x}, {current_y}): Logic error random move. Halting."); return MOVE_HALT
 
     def _is_safe_cell(self, x: int, y: int) -> bool:
         if not self._in_bounds(x, y): return False
-        try: return self.map[x][y] in [WALKABLE_CELL, FOOD_CELL]
+        try: return self.map.is_walkable(x, y)
         except (IndexError, AttributeError, TypeError) as e: debug_print(f"  _is_safe_cell: Error ({x},{y}): {e}"); return False
 
     def _parse_bot_id(self, cell_value) -> int | None:
@@ -316,9 +320,8 @@ class DebtanuBot(Bot):
             if d == MOVE_HALT: continue
             nx, ny = cx + dx, cy + dy
             if not self._in_bounds(nx, ny): continue
-            try: cell = self.map[nx][ny]
+            try: o_id = self.map.bot_at(nx, ny)
             except (IndexError, AttributeError, TypeError) as e: debug_print(f"  _find_escape_move: Error map access ({nx},{ny}): {e}"); continue
-            o_id = self._parse_bot_id(cell)
             if o_id is not None and o_id != self.id:
                 o_food = self.bot_food.get(o_id, 1)
                 if o_food >= my_food: threat_dirs.append(d); threats.append((nx,ny))
@@ -333,45 +336,31 @@ class DebtanuBot(Bot):
             if esc_dir and moves.get(esc_dir, False):
                  ex, ey = cx + MOVEMENTS[esc_dir][0], cy + MOVEMENTS[esc_dir][1]
                  try:
-                     if self._in_bounds(ex, ey) and self.map[ex][ey] == FOOD_CELL: return esc_dir # Best
+                     if self._in_bounds(ex, ey) and self.map.is_food(ex, ey): return esc_dir # Best
                  except (IndexError, AttributeError, TypeError) as e: debug_print(f"  _find_escape_move: Error food check ({ex},{ey}): {e}")
                  safe_away.append(esc_dir)
-        if safe_away: return random.choice(list(set(safe_away)))
+        if safe_away: return self.rng.choice(list(set(safe_away)))
         other_safe = [d for d in potential if moves.get(d, False)]
         if other_safe:
              for m in other_safe:
                  ex, ey = cx + MOVEMENTS[m][0], cy + MOVEMENTS[m][1]
                  try:
-                     if self._in_bounds(ex, ey) and self.map[ex][ey] == FOOD_CELL: return m # Prefer food
+                     if self._in_bounds(ex, ey) and self.map.is_food(ex, ey): return m # Prefer food
                  except (IndexError, AttributeError, TypeError) as e: debug_print(f"  _find_escape_move: Error food check ({ex},{ey}): {e}")
-             return random.choice(other_safe)
+             return self.rng.choice(other_safe)
         debug_print(f"  No safe adjacent escape. Trying BFS...");
-        def iwf(x,y,c): return self._in_bounds(x,y) and c in [WALKABLE_CELL, FOOD_CELL]
-        def ist(x,y,c): return self._in_bounds(x,y) and c in [WALKABLE_CELL, FOOD_CELL]
-        bfs_move = self._bfs(is_target_fn=ist, is_walkable_fn=iwf, max_depth=ESCAPE_BFS_DEPTH, bfs_purpose="escape_bfs")
+        bfs_move = self._nav_move(self.nav.nearest((WALKABLE_CODE, FOOD_CODE), ESCAPE_BFS_DEPTH), "escape_bfs")
         if bfs_move is not None: return bfs_move
         debug_print(f"Bot {self.id} at ({cx}, {cy}): Trapped! Halting."); return MOVE_HALT
 
     def _find_hunt_move(self) -> int | None:
         try: my_food = self.bot_food.get(self.id, 1)
         except AttributeError: debug_print("  _find_hunt_move: ERROR - state missing."); return None
-        def is_target(x, y, c):
-            if not self._in_bounds(x,y): return False
-            o_id = self._parse_bot_id(c)
-            if o_id is not None and o_id != self.id: return my_food > self.bot_food.get(o_id, 1) + HUNT_SCORE_DIFFERENCE
-            return False
-        def is_walkable(x, y, c):
-            if not self._in_bounds(x,y): return False
-            if c in [WALKABLE_CELL, FOOD_CELL]: return True
-            o_id = self._parse_bot_id(c)
-            if o_id is not None and o_id != self.id: return my_food > self.bot_food.get(o_id, 1) + HUNT_SCORE_DIFFERENCE
-            return False
-        return self._bfs(is_target_fn=is_target, is_walkable_fn=is_walkable, max_depth=DEFAULT_BFS_DEPTH, bfs_purpose="hunt")
+        def is_target(o_id): return o_id != self.id and my_food > self.bot_food.get(o_id, 1) + HUNT_SCORE_DIFFERENCE
+        return self._nav_move(self.nav.nearest_bot(is_target, DEFAULT_BFS_DEPTH), "hunt")
 
     def _find_food_move(self) -> int | None:
-        def is_target(x,y,c): return self._in_bounds(x,y) and c == FOOD_CELL
-        def is_walkable(x,y,c): return self._in_bounds(x,y) and c in [WALKABLE_CELL, FOOD_CELL]
-        return self._bfs(is_target_fn=is_target, is_walkable_fn=is_walkable, max_depth=DEFAULT_BFS_DEPTH, bfs_purpose="food")
+        return self._nav_move(self.nav.nearest_food(DEFAULT_BFS_DEPTH), "food")
 
     def _get_perimeter_patrol_move(self) -> int | None:
         try:
@@ -409,33 +398,12 @@ class DebtanuBot(Bot):
         try: return len(set(self.position_history)) <= STUCK_THRESHOLD
         except TypeError: debug_print("  _is_stuck: TypeError."); return False
 
-    def _bfs(self, is_target_fn, is_walkable_fn, max_depth: int, bfs_purpose: str = "general") -> int | None:
-        try: start_x, start_y = self.x, self.y
-        except AttributeError: debug_print(f"  BFS ({bfs_purpose}): ERROR - state missing."); return None
-        queue = deque([(start_x, start_y, None, 0)]); visited = set([(start_x, start_y)]); found_target_move = None
-        while queue:
-            cx, cy, first_move, depth = queue.popleft()
-            try:
-                if not self._in_bounds(cx, cy): continue
-                current_cell_value = self.map[cx][cy]
-                if depth > 0 and is_target_fn(cx, cy, current_cell_value):
-                    debug_print(f"  BFS ({bfs_purpose}): Found target at ({cx},{cy}) via move {first_move} at depth {depth}")
-                    found_target_move = first_move; break
-            except (IndexError, AttributeError, TypeError) as e: debug_print(f"  BFS ({bfs_purpose}): Error map access ({cx},{cy}): {e}"); continue
-            if depth >= max_depth: continue
-            shuffled_directions = list(MOVEMENTS.items()); random.shuffle(shuffled_directions)
-            for direction, (dx, dy) in shuffled_directions:
-                if direction == MOVE_HALT: continue
-                nx, ny = cx + dx, cy + dy
-                if not self._in_bounds(nx, ny): continue
-                try:
-                    if (nx, ny) not in visited:
-                        neighbor_cell_value = self.map[nx][ny]
-                        if is_walkable_fn(nx, ny, neighbor_cell_value):
-                            visited.add((nx, ny)); next_first_move = first_move if first_move is not None else direction
-                            queue.append((nx, ny, next_first_move, depth + 1))
-                except (IndexError, AttributeError, TypeError) as e: debug_print(f"  BFS ({bfs_purpose}): Error neighbor access ({nx},{ny}): {e}"); continue
-        return found_target_move
+    def _nav_move(self, target, nav_purpose: str = "general") -> int | None:
+        """First move towards a target found by self.nav, None if there is no target."""
+        if target is None: return None
+        first_move = self.nav.first_step(*target)
+        debug_print(f"  Nav ({nav_purpose}): Found target at {target} via move {first_move} at depth {self.nav.distance(*target)}")
+        return first_move
 
     def _in_bounds(self, x: int, y: int) -> bool:
         try:
@@ -0,0 +1,210 @@
+"""
+Pathfinding shared by the bots, over the KnownMap of a bot (Bot.compact_map) and the shared
+grid neighbour table, so bots do not each carry their own BFS.
+
+NavField is not an incremental distance field: it caches one breadth first search per bot
+position, and since a bot moves on almost every turn, almost every move pays for a full
+search up to max_depth. The cache only saves the repeated searches within a turn, and the
+search of a turn spent standing still. NavField.find() is a fresh search on every call.
+
+This module must not define Bot subclasses: get_number_of_bots() imports every module of
+the bots folder.
+"""
+
+from constants import *
+from modules.neighbors import grid_neighbors
+
+_OPPOSITE_MOVES = {MOVE_UP: MOVE_DOWN, MOVE_DOWN: MOVE_UP, MOVE_LEFT: MOVE_RIGHT, MOVE_RIGHT: MOVE_LEFT}
+
+# Distance and first step field of a bot over the map it knows
+class NavField:
+    """
+    One breadth first search from the bot's position over the walkable and food cells of its
+    KnownMap (Bot.compact_map), up to max_depth steps. The field reads the bot's map directly
+    and only keeps the distance and first move of the cells the last search reached, so it
+    adds no per cell memory to the bot.
+
+    The search records the distance and the first move of every reached cell, so after it
+    "how far is (x, y)", "which way to (x, y)" and "nearest food" are lookups instead of a
+    new BFS per question. The search runs at most once per tick, on the first query, and
+    is kept while the bot stays on the same cell and no revealed cell changed whether it can
+    be walked on (food appearing or being eaten does not invalidate it). Moving to another
+    cell always throws it away, so a moving bot runs a full search every turn.
+
+    find() answers "which targets can I reach" with other walking rules (through some bots,
+    stopping at targets) in its own search.
+    """
+
+    def __init__(self, known_map, max_depth: int = None, rng=None):
+        """
+        :param known_map: The bot's KnownMap, read but never written
+        :param max_depth: Steps the search goes from the bot, the whole map if None
+        :param rng: Random generator shuffling the order the first moves are tried in every search
+                    (ties between equally short paths), MOVEMENTS order if None
+        """
+        self.rows = known_map.rows
+        self.cols = known_map.cols
+        self.neighbors = grid_neighbors(self.rows, self.cols)
+        self.max_depth = max_depth if max_depth is not None else self.rows * self.cols
+        self.rng = rng
+        self.codes = known_map.codes    # Cell codes of the known map, shared with it
+        self.bots = known_map.bots      # { flat index -> bot id } of the known map, shared with it
+        self.position = None    # Flat index of the bot
+        self._distance = {}     # { flat index -> steps from the bot } of the cells reached by the last search
+        self._step = {}         # { flat index -> first move } of the same cells
+        self._order = []        # Reached cells in order of distance
+        self._searched = False
+
+    def update(self, x: int, y: int, changes: list):
+        """
+        Move the bot to (x, y) and look at the changes of its known map, which is already updated
+        :param x: Current x coordinate of the bot
+        :param y: Current y coordinate of the bot
+        :param changes: Changed cells as (x, y, old cell, new cell), see Bot.map_changes
+        """
+        position = x * self.cols + y
+        if position != self.position:
+            self.position = position
+            self._searched = False
+        for _, _, old, cell in changes:
+            # Bot cells are not in CELL_CODES and cannot be walked on
+            if (CELL_CODES.get(old, BOT_CODE) <= FOOD_CODE) != (CELL_CODES.get(cell, BOT_CODE) <= FOOD_CODE):
+                self._searched = False
+                break
+
+    def _search(self):
+        distance, step = self._distance, self._step
+        distance.clear()
+        step.clear()
+        codes, offsets, cells = self.codes, self.neighbors.offsets, self.neighbors.cells
+        start = self.position
+        distance[start] = 0
+        step[start] = MOVE_HALT
+
+        # The first moves, in random order. Later cells keep the first move of the cell they are reached from.
+        first_moves = list(zip(self.neighbors.neighbors(start), self.neighbors.moves_from(start)))
+        if self.rng is not None:
+            self.rng.shuffle(first_moves)
+        frontier = []
+        for n, direction in first_moves:
+            if codes[n] <= FOOD_CODE:
+                distance[n] = 1
+                step[n] = direction
+                frontier.append(n)
+        order = [start] + frontier
+        depth = 1
+        while frontier and depth < self.max_depth:
+            depth += 1
+            next_frontier = []
+            for k in frontier:
+                for n in cells[offsets[k]:offsets[k + 1]]:
+                    if n not in distance and codes[n] <= FOOD_CODE:
+                        distance[n] = depth
+                        step[n] = step[k]
+                        next_frontier.append(n)
+            order.extend(next_frontier)
+            frontier = next_frontier
+        self._order = order
+        self._searched = True
+
+    def _reach(self, k: int) -> tuple:
+        """
+        (distance, first move) to the flat index k, (-1, None) if it was not reached. A cell that
+        cannot be walked on (a bot) is reached through its closest reached neighbour.
+        """
+        if not self._searched:
+            self._search()
+        distance = self._distance
+        if k in distance:
+            return distance[k], self._step[k]
+        best = (-1, None)
+        for n, direction in zip(self.neighbors.neighbors(k), self.neighbors.moves_from(k)):
+            if n in distance and (best[0] < 0 or distance[n] + 1 < best[0]):
+                # From the bot's own cell, the move is the opposite of the one from k to n
+                best = (distance[n] + 1, self._step[n] if n != self.position else _OPPOSITE_MOVES[direction])
+        return best
+
+    def distance(self, x: int, y: int) -> int:
+        """
+        Steps from the bot to (x, y), -1 if it is not reachable within max_depth
+        """
+        return self._reach(x * self.cols + y)[0]
+
+    def first_step(self, x: int, y: int):
+        """
+        First move of a shortest path from the bot to (x, y), None if it is not reachable
+        within max_depth (MOVE_HALT for the bot's own cell)
+        """
+        return self._reach(x * self.cols + y)[1]
+
+    def nearest(self, codes: tuple, max_depth: int = None):
+        """
+        Closest cell other than the bot's own holding one of the given cell codes, as (x, y),
+        None if there is none within max_depth steps
+        """
+        if not self._searched:
+            self._search()
+        cell_codes, distance = self.codes, self._distance
+        max_depth = self.max_depth if max_depth is None else max_depth
+        for k in self._order[1:]:
+            if distance[k] > max_depth:
+                break
+            if cell_codes[k] in codes:
+                return divmod(k, self.cols)
+        return None
+
+    def nearest_food(self, max_depth: int = None):
+        """
+        Closest known food as (x, y), None if there is none within max_depth steps
+        """
+        return self.nearest((FOOD_CODE,), max_depth)
+
+    def nearest_bot(self, is_target, max_depth: int = None):
+        """
+        Closest known bot for which is_target(bot_id) is True as (x, y), None if there is
+        none within max_depth steps
+        """
+        max_depth = self.max_depth if max_depth is None else max_depth
+        best, best_distance = None, max_depth + 1
+        for k, bot_id in self.bots.items():
+            if k != self.position and is_target(bot_id):
+                d = self._reach(k)[0]
+                if 0 < d < best_distance:
+                    best, best_distance = k, d
+        return divmod(best, self.cols) if best is not None else None
+
+    def find(self, target_codes: tuple = (), target_bots=(), passable_bots=(), max_depth: int = None) -> list:
+        """
+        Breadth first search from the bot, trying the moves in MOVEMENTS order, through the
+        walkable and food cells and the cells of the bots in passable_bots, up to max_depth steps.
+        A cell holding one of target_codes or a bot of target_bots is a target: it is recorded
+        and the search does not go past it. The bot's own cell is checked too.
+        :return: (flat index, first move) of every target reached, in the order they were found.
+                 The first move is None for the bot's own cell.
+        """
+        codes, bots = self.codes, self.bots
+        offsets, cells, moves = self.neighbors.offsets, self.neighbors.cells, self.neighbors.moves
+        max_depth = self.max_depth if max_depth is None else max_depth
+        found = []
+        visited = {self.position}
+        frontier = [(self.position, None)]
+        for depth in range(max_depth + 1):
+            next_frontier = []
+            for k, first_move in frontier:
+                code = codes[k]
+                if code in target_codes or (code == BOT_CODE and bots[k] in target_bots):
+                    found.append((k, first_move))
+                    continue
+                if depth == max_depth:
+                    continue
+                for i in range(offsets[k], offsets[k + 1]):
+                    n = cells[i]
+                    if n not in visited:
+                        code = codes[n]
+                        if code <= FOOD_CODE or (code == BOT_CODE and bots[n] in passable_bots):
+                            visited.add(n)
+                            next_frontier.append((n, first_move if first_move is not None else moves[i]))
+            if not next_frontier:
+                break
+            frontier = next_frontier
+        return found
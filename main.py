@@ -2,11 +2,19 @@
 
 import pygame
 import sys
+import random
+import time
 from constants import * # Make sure FOOD_CELL is defined here
+from modules.display import * # Screen dimensions and colors, only needed by the UI
 from modules.map_generator import generate_map
 from modules.food_generator import generate_food
 from modules.bot_operations import *
-from modules.speed_buttons import get_speed_buttons
+from modules.speed_buttons import get_speed_buttons, get_frame_buttons, TURBO, TURBO_FPS
+from modules.game_config import GameConfig
+from modules.map_bank import MAP_BANK_SIZE, load_map_bank, open_map_bank
+from modules.time_budget import BotTimeBudget
+from modules.replay import Replay, ReplayPlayer
+from modules.renderer import Renderer, get_font
 
 try:
     # Initialize the game using pygame UI
@@ -17,88 +25,6 @@ except pygame.error as e:
     print(f"Error initializing pygame: {e}")
     sys.exit(1)
 
-# Draws the entire game screen snapshot on the application
-# (DO NOT CHANGE THIS, YOUR CHANGES WILL BE IGNORED IN THE COMPETITION)
-def draw_game_screen(screen: pygame.Surface, speed_buttons: list, map: list, moves_left: int, bot_food: dict, bot_names: dict):
-    """
-    Draws game screen on the application
-    :param screen: UI screen
-    :param speed_buttons: List of speed buttons to alter game speed
-    :param map: 2D list representing the game map
-    :param moves_left: number of moves left to play in the game
-    :param bot_food: Dictionary containing the food count of the bots
-    :param bot_names: Dictionary containing the names of the bots
-    """
-    try:
-        # Draw game title
-        font = pygame.font.SysFont('Arial', 45, bold=True)  # Use Arial font with size 30 and bold
-        text = font.render("PACMAN WARS", True, TEXT_COLOR)
-        screen.blit(text, (WIDTH // 2 - text.get_width() // 2, 20))
-
-        # Draw speed buttons
-        font = pygame.font.SysFont('Arial', 15, bold=False)
-        text = font.render(f"Change game speed", True, TEXT_COLOR)
-        screen.blit(text, (WIDTH + 10, HEIGHT - 80))
-        for button in speed_buttons:
-            button.draw(screen, font)
-
-        # Draw grid map
-        font = pygame.font.SysFont(None, 18)
-        for i, row in enumerate(map):
-            for j, cell in enumerate(row):
-                # Basic check for non-uniform rows
-                if j < len(row):
-                    cell_value = row[j]
-                    if cell_value in COLOR_MAP.keys():    # If its not a player cell
-                        color = COLOR_MAP[cell_value]
-                    else:   # Player cell will be marked by a number rather than 'P'
-                        color = COLOR_MAP.get(PLAYER_CELL, (255, 255, 255)) # Use default white if PLAYER_CELL missing
-                    
-                    # Draw the cell with desired color
-                    pygame.draw.rect(screen, color, (j * CELL_SIZE, i * CELL_SIZE + 100, CELL_SIZE, CELL_SIZE))
-                    pygame.draw.rect(screen, BORDER_COLOR, (j * CELL_SIZE, i * CELL_SIZE + 100, CELL_SIZE, CELL_SIZE), 1)
-
-                    # If its a player cell, draw the player number
-                    if cell_value not in COLOR_MAP.keys():
-                        text = font.render(str(cell_value), True, (0, 0, 0))  # Black text for player numbers
-                        screen.blit(text, (j * CELL_SIZE + CELL_SIZE // 3, i * CELL_SIZE + 100 + CELL_SIZE // 4))
-                # else: # Handle potentially jagged map rows if necessary
-                    # pygame.draw.rect(screen, OUT_OF_BOUNDS_COLOR, (j * CELL_SIZE, i * CELL_SIZE + 100, CELL_SIZE, CELL_SIZE))
-                    # pygame.draw.rect(screen, BORDER_COLOR, (j * CELL_SIZE, i * CELL_SIZE + 100, CELL_SIZE, CELL_SIZE), 1)
-
-
-        # Draw moves left
-        font = pygame.font.SysFont('Arial', 25, bold=True)  # Use Arial font with size 30 and bold
-        text = font.render(f"Moves left : {moves_left}", True, TEXT_COLOR)
-        screen.blit(text, (WIDTH + 20, 20))
-
-        # Draw score board
-        font = pygame.font.SysFont('Arial', 20, bold=False)  # Use Arial font with size 20 and not bold
-        sorted_bots = sorted(bot_food.items(), key=lambda item: item[1], reverse=True)
-
-        x_offset = WIDTH + 20
-        y_offset = 120
-        scoreboard_width = 180
-        # Adjust height dynamically based on number of bots
-        scoreboard_height = 40 + len(sorted_bots) * 30
-
-        # Draw the box around the scoreboard
-        pygame.draw.rect(screen, BORDER_COLOR, (x_offset - 10, y_offset - 10, scoreboard_width, scoreboard_height), 2)
-
-        screen.blit(font.render("Scoreboard", True, TEXT_COLOR), (x_offset, y_offset))
-        y_offset += 30
-
-        for bot_id, food in sorted_bots:
-            # Ensure bot_id exists in bot_names before accessing
-            bot_name = bot_names.get(bot_id, f"Bot {bot_id}") # Provide default name if missing
-            text = f"{bot_id}. {bot_name}: {food}"
-            screen.blit(font.render(text, True, TEXT_COLOR), (x_offset, y_offset))
-            y_offset += 30
-    except Exception as e:
-        print(f"Error in draw_game_screen: {e}")
-        # Optionally re-raise or handle differently
-        # raise
-
 # Draws game over screen with the winner name
 # (DO NOT CHANGE THIS, YOUR CHANGES WILL BE IGNORED IN THE COMPETITION)
 def draw_game_over_screen(screen: pygame.Surface, winner_bot_name: str):
@@ -120,28 +46,56 @@ def draw_game_over_screen(screen: pygame.Surface, winner_bot_name: str):
 
 # Main loop of the game
 # (DO NOT CHANGE THIS, YOUR CHANGES WILL BE IGNORED IN THE COMPETITION)
-def main():
+def main(config: GameConfig = None, seed: int = None, map_bank_path: str = None):
+    """
+    Play a game in the pygame UI
+    :param config: Game settings, the standard game if not given
+    :param seed: Seed of the game, the same seed, settings and map bank play the same game as simulate.py (random if None)
+    :param map_bank_path: Map bank file to take the map from (seed % bank size), a new map is generated if None
+    """
     try:
+        if config is None:
+            config = GameConfig()
+        if seed is None:
+            seed = random.randrange(2**32)
+        print(f"Game seed: {seed}")
+        rng = random.Random(seed)   # Random generator of this game
+        random.seed(seed)   # Bots that still use the random module are reproducible too
         clock = pygame.time.Clock()     # Game clock
-        map = generate_map(0.6, 0.6, 200)   # Generate the game map
-        number_of_bots = get_number_of_bots()   # Get the number of bots
-        bot_positions = generate_bot_positions(map, number_of_bots)  # Generate the bot positions
-        bots, bot_names = load_bots(bot_positions, map) # Generate bot objects with names
+        if map_bank_path is not None:
+            map_bank = open_map_bank(map_bank_path)
+            map = map_bank[seed % len(map_bank)]    # Same map as simulate.py gives this seed
+        else:
+            map = generate_map(**config.map_params(), rng=rng)   # Generate the game map
+        bot_classes = get_bot_classes()     # Bot classes in the same order as simulate.py
+        number_of_bots = len(bot_classes)   # Get the number of bots
+        if config.number_of_bots is not None:
+            number_of_bots = config.number_of_bots
+        bot_positions = generate_bot_positions(map, number_of_bots, rng)  # Generate the bot positions
+        bots, bot_names = load_bots(bot_positions, map, bot_classes, rng=rng) # Generate bot objects with names
         bot_food = {id: 1 for id in bot_positions.keys()}  # Initialize the food count for each bot
         bot_ids = {id: BOT_ALIVE for id in range(1, number_of_bots + 1)} # Initialize the bot ids with BOT_ALIVE status
         speed_buttons = get_speed_buttons()     # Generate speed buttons to alter game speed
+        frame_buttons = get_frame_buttons()     # Generate buttons to skip frames
+        renderer = Renderer(screen, speed_buttons, bot_names, frame_buttons)   # Redraws only what changed every frame
         num_of_alive_bots = number_of_bots      # Number of bots still alive
         game_tick = 1   # Game speed
+        ticks_per_frame = 1     # Game ticks played per frame drawn, TURBO to play as many as fit in a frame at TURBO_FPS
+        minimaps = {}   # Minimap buffers reused every tick
+        time_budget = None  # CPU time limits of the bots
+        if config.move_time_limit is not None or config.game_time_limit is not None:
+            time_budget = BotTimeBudget(config.move_time_limit, config.game_time_limit)
 
         is_game_running = True  # Game loop
-        game_counter = 1000 # Maximum game moves
+        game_counter = config.max_game_moves # Maximum game moves
 
         # --- Configuration for Food Generation (Option D) ---
-        MAX_FOOD_PERCENTAGE = 0.15 # Adjust this: Max 15% of map cells should be food
-        FOOD_GENERATION_QUANTITY_PER_BOT = 1 # How much food to potentially add per alive bot
+        MAX_FOOD_PERCENTAGE = config.max_food_percentage # Max share of map cells that should be food
+        FOOD_GENERATION_QUANTITY_PER_BOT = config.food_generation_quantity_per_bot # How much food to potentially add per alive bot
         # --- End Configuration ---
 
         while is_game_running:
+            dirty_rects = None  # Parts of the screen to update, the whole screen if None
             for event in pygame.event.get():
                 if event.type == pygame.QUIT:
                     is_game_running = False
@@ -149,42 +103,57 @@ def main():
                     for button in speed_buttons:
                         if button.is_clicked(event.pos):
                             game_tick = button.action()
+                    for button in frame_buttons:
+                        if button.is_clicked(event.pos):
+                            ticks_per_frame = button.action()
 
             # --- Game Logic Execution ---
             if game_counter > 0 and num_of_alive_bots > 1: # Check if game is still running normally
-                # 1. Calculate Bot Moves
-                bot_directions = calculate_bot_directions(map, bots, bot_positions, bot_ids, bot_food)
-
-                # 2. Move Bots (This should handle eating food and updating map)
-                move_bots(map, bot_ids, bot_positions, bot_directions, bot_food)
-
-                # 3. Update Alive Bot Count (Crucial after moves/battles)
-                num_of_alive_bots = sum(1 for i in bot_ids.values() if i == BOT_ALIVE)
-
-                # 4. Conditional Food Generation (Option D)
-                rows = len(map)
-                cols = len(map[0]) if rows > 0 else 0
-                if rows > 0 and cols > 0: # Ensure map is valid
-                    total_cells = rows * cols
-                    # Count only FOOD_CELL, not walkable or others
-                    food_count = sum(row.count(FOOD_CELL) for row in map)
-                    current_food_percentage = food_count / total_cells
-
-                    # Check threshold before generating food
-                    if current_food_percentage < MAX_FOOD_PERCENTAGE:
-                        # Calculate quantity based on alive bots
-                        quantity_to_generate = num_of_alive_bots * FOOD_GENERATION_QUANTITY_PER_BOT
-                        # print(f"Debug: Food % ({current_food_percentage:.2f}) < Threshold ({MAX_FOOD_PERCENTAGE}). Generating up to {quantity_to_generate} food.") # Optional Debug
-                        generate_food(map, quantity_to_generate)
-                    # else:
-                        # print(f"Debug: Food % ({current_food_percentage:.2f}) >= Threshold ({MAX_FOOD_PERCENTAGE}). Skipping food generation.") # Optional Debug
-                else:
-                    print("Warning: Map dimensions invalid, skipping food generation.")
-
+                frame_end = time.perf_counter() + 1 / TURBO_FPS
+                ticks_played = 0
+                while True:
+                    # 1. Calculate Bot Moves
+                    bot_directions = calculate_bot_directions(map, bots, bot_positions, bot_ids, bot_food, minimaps, time_budget)
+
+                    # 2. Move Bots (This should handle eating food and updating map)
+                    move_bots(map, bot_ids, bot_positions, bot_directions, bot_food)
+
+                    # 3. Update Alive Bot Count (Crucial after moves/battles)
+                    num_of_alive_bots = sum(1 for i in bot_ids.values() if i == BOT_ALIVE)
+
+                    # 4. Conditional Food Generation (Option D)
+                    rows = len(map)
+                    cols = len(map[0]) if rows > 0 else 0
+                    if rows > 0 and cols > 0: # Ensure map is valid
+                        total_cells = rows * cols
+                        # Count only FOOD_CELL, not walkable or others
+                        food_count = map.food_count
+                        current_food_percentage = food_count / total_cells
+
+                        # Check threshold before generating food
+                        if current_food_percentage < MAX_FOOD_PERCENTAGE:
+                            # Calculate quantity based on alive bots
+                            quantity_to_generate = num_of_alive_bots * FOOD_GENERATION_QUANTITY_PER_BOT
+                            # print(f"Debug: Food % ({current_food_percentage:.2f}) < Threshold ({MAX_FOOD_PERCENTAGE}). Generating up to {quantity_to_generate} food.") # Optional Debug
+                            generate_food(map, quantity_to_generate, rng)
+                        # else:
+                            # print(f"Debug: Food % ({current_food_percentage:.2f}) >= Threshold ({MAX_FOOD_PERCENTAGE}). Skipping food generation.") # Optional Debug
+                    else:
+                        print("Warning: Map dimensions invalid, skipping food generation.")
+
+                    # Play the next tick in the same frame, unless the game ends with this one
+                    ticks_played += 1
+                    if num_of_alive_bots <= 1 or game_counter <= 1:
+                        break
+                    if ticks_per_frame == TURBO:
+                        if time.perf_counter() >= frame_end:
+                            break
+                    elif ticks_played >= ticks_per_frame:
+                        break
+                    game_counter -= 1
 
                 # 5. Draw Screen
-                screen.fill(BACKGROUND_COLOR)
-                draw_game_screen(screen, speed_buttons, map, game_counter, bot_food, bot_names)
+                dirty_rects = renderer.draw(map, game_counter, bot_food)
 
                 # --- REMOVED OLD generate_food CALL ---
                 # generate_food(map, number_of_bots) # <<< THIS IS THE OLD CALL, NOW REMOVED/HANDLED ABOVE
@@ -222,6 +191,7 @@ def main():
 
                 screen.fill(BACKGROUND_COLOR)
                 draw_game_over_screen(screen, winner_name)
+                renderer.invalidate()
 
                 # Optional: Add a small delay or wait for click before quitting on game over
                 # pygame.time.wait(3000)
@@ -229,8 +199,11 @@ def main():
 
             # --- Update Display and Tick Clock ---
             game_counter -= 1
-            pygame.display.flip()
-            clock.tick(game_tick)
+            if dirty_rects is None:
+                pygame.display.flip()
+            else:
+                pygame.display.update(dirty_rects)
+            clock.tick(TURBO_FPS if ticks_per_frame == TURBO else game_tick)
 
     except Exception as e:
         print(f"Error in main game loop: {e}")
@@ -239,9 +212,118 @@ def main():
     finally:
         pygame.quit()
 
+# Frames per second of the replay viewer, independent of the playback speed
+REPLAY_FPS = 30
+
+# Position of the replay progress bar, between the title and the board
+def get_progress_bar() -> pygame.Rect:
+    return pygame.Rect(10, 78, WIDTH - 20, 14)
+
+# Draws the progress bar and tick counter of a replay over the renderer's screen
+def draw_replay_progress(renderer: Renderer, tick: int, num_ticks: int, paused: bool) -> list:
+    """
+    :param renderer: Renderer of the replay
+    :param tick: Tick shown on the screen
+    :param num_ticks: Number of ticks of the replay
+    :param paused: True if the playback is paused
+    :return: the rectangles of the screen that were drawn
+    """
+    screen = renderer.screen
+    bar = renderer.restore(get_progress_bar())
+    pygame.draw.rect(screen, BORDER_COLOR, bar)
+    if num_ticks > 0:
+        pygame.draw.rect(screen, FOOD_CELL_COLOR, (bar.x, bar.y, bar.width * tick // num_ticks, bar.height))
+    pygame.draw.rect(screen, TEXT_COLOR, bar, 1)
+    counter = renderer.restore(pygame.Rect(WIDTH + 20, 60, screen.get_width() - WIDTH - 20, 20))
+    text = get_font('Arial', 15).render(f"Tick {tick} / {num_ticks}" + (" (paused)" if paused else ""), True, TEXT_COLOR)
+    screen.blit(text, counter)
+    return [bar, counter]
+
+# Replay viewer
+def play_replay(path: str):
+    """
+    Play back a game recorded with simulate.py --record-replays, no bot code is run.
+    Speed buttons set the ticks per second. Space pauses, Left/Right step one tick,
+    Down/Up seek 100 ticks, Home/End jump to the start/end and clicking the progress
+    bar seeks to that point.
+    :param path: Replay file
+    """
+    try:
+        replay = Replay.load(path)
+        player = ReplayPlayer(replay)
+        if replay.seed is not None:
+            print(f"Game seed: {replay.seed}")
+        clock = pygame.time.Clock()
+        speed_buttons = get_speed_buttons()
+        renderer = Renderer(screen, speed_buttons, replay.bot_names)
+        progress_bar = get_progress_bar()
+        ticks_per_second = 1
+        position = 0.0  # Playback position in ticks, advanced with the wall clock
+        paused = False
+        seek_keys = {pygame.K_LEFT: -1, pygame.K_RIGHT: 1, pygame.K_DOWN: -100, pygame.K_UP: 100}
+
+        is_running = True
+        while is_running:
+            target = None
+            for event in pygame.event.get():
+                if event.type == pygame.QUIT:
+                    is_running = False
+                elif event.type == pygame.MOUSEBUTTONDOWN:
+                    for button in speed_buttons:
+                        if button.is_clicked(event.pos):
+                            ticks_per_second = button.action()
+                    if progress_bar.collidepoint(event.pos):
+                        target = round((event.pos[0] - progress_bar.x) / progress_bar.width * replay.num_ticks)
+                elif event.type == pygame.KEYDOWN:
+                    if event.key == pygame.K_SPACE:
+                        paused = not paused
+                    elif event.key in seek_keys:
+                        target = player.tick + seek_keys[event.key]
+                    elif event.key == pygame.K_HOME:
+                        target = 0
+                    elif event.key == pygame.K_END:
+                        target = replay.num_ticks
+
+            elapsed = clock.tick(REPLAY_FPS) / 1000
+            if target is not None:
+                player.seek(target)
+                position = float(player.tick)
+            elif not paused and player.tick < replay.num_ticks:
+                position = min(position + ticks_per_second * elapsed, replay.num_ticks)
+                player.seek(int(position))
+
+            map, bot_positions, bot_ids, bot_food = player.state
+            dirty_rects = renderer.draw(map, replay.num_ticks - player.tick, bot_food)
+            dirty_rects += draw_replay_progress(renderer, player.tick, replay.num_ticks, paused)
+            pygame.display.update(dirty_rects)
+
+    except Exception as e:
+        print(f"Error in replay viewer: {e}")
+        raise
+    finally:
+        pygame.quit()
+
 if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Play PacmanWars in the pygame UI.")
+    parser.add_argument("--rows", type=int, default=ROWS, help="Number of rows of the board")
+    parser.add_argument("--cols", type=int, default=COLS, help="Number of columns of the board")
+    parser.add_argument("--bots", type=int, default=None, help="Number of bots, the bot classes are reused in turn (default: one per bot class)")
+    parser.add_argument("--seed", type=int, default=None, help="Seed of the game, replays a game from simulate.py with the same settings (random if not given)")
+    parser.add_argument("--map-bank", default=None, metavar="DIR", help="Play on a map from a map bank cached in this directory, like simulate.py --map-bank")
+    parser.add_argument("--bank-size", type=int, default=MAP_BANK_SIZE, help="Number of maps in the map bank")
+    parser.add_argument("--bank-seed", type=int, default=0, help="Seed of the map bank")
+    parser.add_argument("--replay", default=None, metavar="PATH", help="Watch a game recorded with simulate.py --record-replays")
+    args = parser.parse_args()
     try:
-        main()
+        if args.replay is not None:
+            play_replay(args.replay)
+        else:
+            config = GameConfig(rows=args.rows, cols=args.cols, number_of_bots=args.bots)
+            map_bank_path = None
+            if args.map_bank is not None:
+                map_bank_path = load_map_bank(args.map_bank, args.bank_size, args.bank_seed, config).path
+            main(config, args.seed, map_bank_path)
     except Exception as e:
         # Print fatal errors that might occur outside the main loop's try-except
         print(f"Fatal error during execution: {e}")
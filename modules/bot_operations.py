@@ -1,8 +1,11 @@
 import os
+import sys
 import importlib
 import random
 from constants import *
 from bots.bot import Bot
+from modules.game_map import GameMap, MinimapView, BLOCKED_CODES
+from modules.time_budget import BotTimeBudget
 from typing import Dict
 
 # Get the 5x5 minimap of the player
@@ -11,6 +14,30 @@ def get_minimap(map, x, y):
     minimap = [row[y - 2: y+3] for row in map[x - 2: x+3]]
     return minimap
 
+# Get the 5x5 minimaps of all the alive bots for this tick
+def get_minimaps(map: GameMap, bot_positions: dict, bot_ids: dict, minimaps: dict) -> dict:
+    """
+    Fill the minimaps of all the alive bots in one pass. Every bot keeps the same 5x5 buffer for the
+    whole game, overwritten in place every tick, so nothing is allocated. Bots get it as a read-only
+    MinimapView: writing to it raises, and a bot must copy it to keep it past its move. A bot closer
+    than 2 cells to the edge of the board gets a view of a fresh get_minimap() instead, as its slices
+    are shorter there.
+    :param map: The game map
+    :param bot_positions: Dictionary containing bot positions
+    :param bot_ids: Dictionary containing bot ids
+    :param minimaps: Dictionary of { bot_id -> MinimapView } reused across the ticks of a game, filled in place
+    """
+    tick_minimaps = {}
+    for id, (x, y) in bot_positions.items():
+        if bot_ids[id] == BOT_ALIVE:
+            minimap = minimaps.get(id)
+            if minimap is None:
+                minimap = minimaps[id] = MinimapView([[None] * 5 for _ in range(5)])
+            if not map.fill_minimap(minimap.cells, x, y):
+                minimap = MinimapView(get_minimap(map, x, y))
+            tick_minimaps[id] = minimap
+    return tick_minimaps
+
 # Get the number of bots in the bots folder
 # (DO NOT CHANGE THIS, YOUR CHANGES WILL BE IGNORED IN THE COMPETITION)
 def get_number_of_bots():
@@ -22,82 +49,141 @@ def get_number_of_bots():
     
     return len(Bot.__subclasses__())
 
+# Bot classes of the bots folder in a fixed order
+def get_bot_classes() -> list:
+    """
+    Import the bots folder and return its bot classes sorted by module and class name, so that
+    bot i plays the same class in main.py and simulate.py whatever imported the bots first
+    """
+    get_number_of_bots()
+    return sorted(Bot.__subclasses__(), key=lambda bot_class: (bot_class.__module__, bot_class.__name__))
+
 # Load the all bots from the bot folder
 # (DO NOT CHANGE THIS, YOUR CHANGES WILL BE IGNORED IN THE COMPETITION)
-def load_bots(bot_positions: dict, map: list):
-    bot_modules = Bot.__subclasses__()
+def load_bots(bot_positions: dict, map: GameMap, bot_classes: list = None, rng=random):
+    """
+    Create the bot objects, bot i is an instance of the i-th bot class.
+    When there are more bots than classes the classes are reused in turn.
+    Every bot gets its own random generator (bot.rng) seeded from the game's generator.
+    :param bot_positions: Dictionary containing the starting positions of the bots
+    :param map: The game map
+    :param bot_classes: Bot classes to play, all bots from the bots folder if not given
+    :param rng: random.Random instance of the game (or the random module)
+    """
+    bot_modules = bot_classes if bot_classes is not None else Bot.__subclasses__()
     bot_names = {}
     bots = {}
     for ind, (x, y) in bot_positions.items():
-        bot_instance = bot_modules[ind-1](ind, x, y, get_minimap(map, x, y), len(map), len(map[0]))
+        bot_class = bot_modules[(ind-1) % len(bot_modules)]
+        bot_instance = bot_class(ind, x, y, get_minimap(map, x, y), len(map), len(map[0]))
+        bot_instance.rng.seed(rng.getrandbits(64))
         bot_names[ind] = bot_instance.__class__.__name__
         bots[ind] = bot_instance
     return bots, bot_names
 
 # Generate bot positions on the map
 # (DO NOT CHANGE THIS, YOUR CHANGES WILL BE IGNORED IN THE COMPETITION)
-def generate_bot_positions(map: list, num_of_bots: int) -> dict:
+def generate_bot_positions(map: GameMap, num_of_bots: int, rng=random) -> dict:
     """
     Generate bot positions on the map.
-    :param map: 2D list representing the game map
+    :param map: The game map
     :param num_of_players: Number of bot positions to generate
+    :param rng: random.Random instance of the game (or the random module)
     """
     if num_of_bots < 0:
         raise ValueError("Number of players should be greater than 0.")
 
+    if num_of_bots > map.free_count:
+        raise ValueError("Not enough walkable cells for all the players.")
+
     bot_positions = dict()    # Dictionary to store bot positions
     for idx in range(0, num_of_bots):
-        while True:
-            i = random.randint(0, len(map)-1)
-            j = random.randint(0, len(map[0])-1)
-            if map[i][j] == WALKABLE_CELL:  # Generate player on a walkable cell
-                map[i][j] = str(idx + 1)    # Update the map with player number
-                bot_positions[idx+1] = [i, j]     # Store player position
-                break
+        k = map.free_cells.choice(rng)   # Generate player on a walkable cell
+        map.occupy(k, idx + 1)    # Update the map with player number
+        bot_positions[idx+1] = list(divmod(k, map.cols))     # Store player position
     
     return bot_positions
 
 # Execute bot code to find the next move
 # (DO NOT CHANGE THIS, YOUR CHANGES WILL BE IGNORED IN THE COMPETITION)
-def calculate_bot_directions(map: list, bots: Dict[int, Bot], bot_positions: dict, bot_ids: dict, bot_food: dict) -> dict:
+def calculate_bot_directions(map: GameMap, bots: Dict[int, Bot], bot_positions: dict, bot_ids: dict, bot_food: dict, minimaps: dict = None,
+                             time_budget: BotTimeBudget = None) -> dict:
     """
     Calculate the next move for each bot
-    :param map: 2D list representing the game map
+    :param map: The game map
     :param bots: Dictionary containing bot objects
     :param bot_positions: Dictionary containing bot positions
     :param bot_ids: Dictionary containing bot ids
     :param bot_food: Dictionary containing { bot_id -> food count } mapping
+    :param minimaps: Minimap buffers of the game (see get_minimaps), fresh minimaps every tick if None
+    :param time_budget: CPU time limits of the bots, no limits if None
     """
+    tick_minimaps = get_minimaps(map, bot_positions, bot_ids, minimaps) if minimaps is not None else None
     bot_directions = {}
     for id, bot in bots.items():
         if bot_ids[id] == BOT_ALIVE:
-            try:
-                bot_directions[id] = bot.move(
-                    current_x=bot_positions[id][0],
-                    current_y=bot_positions[id][1],
-                    minimap=get_minimap(map, bot_positions[id][0], bot_positions[id][1]),
-                    bot_food=bot_food)
-            except Exception:
-                bot_directions[id] = MOVE_HALT
+            minimap = tick_minimaps[id] if tick_minimaps is not None else get_minimap(map, bot_positions[id][0], bot_positions[id][1])
+            bot_directions[id] = _bot_move(id, bot, bot_positions[id], minimap, bot_food, time_budget)
     return bot_directions
 
+# Call the move method of a bot, MOVE_HALT if it fails
+def _bot_move(id: int, bot: Bot, position: list, minimap: list, bot_food: dict, time_budget: BotTimeBudget) -> int:
+    if time_budget is not None:
+        return time_budget.move(id, bot.move, current_x=position[0], current_y=position[1], minimap=minimap, bot_food=bot_food)
+    try:
+        return bot.move(
+            current_x=position[0],
+            current_y=position[1],
+            minimap=minimap,
+            bot_food=bot_food)
+    except Exception:
+        return MOVE_HALT
+
+# True on a free-threaded Python build running without the GIL, where threads run bots in parallel
+def is_free_threaded() -> bool:
+    is_gil_enabled = getattr(sys, '_is_gil_enabled', None)
+    return is_gil_enabled is not None and not is_gil_enabled()
+
+# Execute the bot code of all the bots at the same time
+def calculate_bot_directions_threaded(executor, map: GameMap, bots: Dict[int, Bot], bot_positions: dict, bot_ids: dict, bot_food: dict,
+                                      minimaps: dict = None, time_budget: BotTimeBudget = None) -> dict:
+    """
+    calculate_bot_directions() with every move() call submitted to a thread pool. A bot's move only
+    depends on its own state and the map before the tick, so the moves are the same as one after
+    the other (as long as bots do not share the random module). Only worth it without the GIL,
+    see is_free_threaded(). Time limits are checked after each move, see BotTimeBudget.
+    :param executor: concurrent.futures.ThreadPoolExecutor running the moves
+    :param map: The game map
+    :param bots: Dictionary containing bot objects
+    :param bot_positions: Dictionary containing bot positions
+    :param bot_ids: Dictionary containing bot ids
+    :param bot_food: Dictionary containing { bot_id -> food count } mapping
+    :param minimaps: Minimap buffers of the game (see get_minimaps), fresh minimaps every tick if None
+    :param time_budget: CPU time limits of the bots, no limits if None
+    """
+    tick_minimaps = get_minimaps(map, bot_positions, bot_ids, minimaps if minimaps is not None else {})
+    futures = {id: executor.submit(_bot_move, id, bots[id], bot_positions[id], minimap, bot_food, time_budget)
+               for id, minimap in tick_minimaps.items()}
+    return {id: future.result() for id, future in futures.items()}
+
 # Calculate final bot positions based on the directions bots are moving
 # (DO NOT CHANGE THIS, YOUR CHANGES WILL BE IGNORED IN THE COMPETITION)
-def calculate_final_bot_positions(map: list, bot_ids: dict, bot_current_positions: dict, bot_directions: dict):
+def calculate_final_bot_positions(map: GameMap, bot_ids: dict, bot_current_positions: dict, bot_directions: dict):
     """
     Calculate the final positions of the bots based on the directions they are moving
-    :param map: The 2D map of the game
+    :param map: The game map
     :param bot_ids: Dictionary containing the IDs of the bots
     :param bot_current_positions: Dictionary containing the current positions of the bots
     :param bot_directions: Dictionary containing the directions in which the bots are moving
     """
+    terrain, cols = map.terrain, map.cols
     bot_final_positions = dict()
     for id in bot_ids.keys():
         if bot_ids[id] == BOT_ALIVE:
             current_x, current_y = bot_current_positions[id]
             direction = bot_directions[id]
             final_x, final_y = current_x + MOVEMENTS[direction][0], current_y + MOVEMENTS[direction][1]
-            if map[final_x][final_y] in [OUT_OF_BOUNDS_CELL, MOUNTAIN_CELL]:
+            if terrain[final_x * cols + final_y] in BLOCKED_CODES:
                 # move not allowed
                 final_x, final_y = current_x, current_y
             bot_final_positions[id] = [final_x, final_y]
@@ -153,10 +239,10 @@ def bot_fights(bot_ids: dict, bot_current_positions: dict, bot_final_positions:
 
 # Move the bots based on the directions they are moving
 # (DO NOT CHANGE THIS, YOUR CHANGES WILL BE IGNORED IN THE COMPETITION)
-def move_bots(map: list, bot_ids: dict, bot_current_positions: dict, bot_directions: dict, bot_food: dict):
+def move_bots(map: GameMap, bot_ids: dict, bot_current_positions: dict, bot_directions: dict, bot_food: dict):
     """
     Move the bots based on the directions they are moving
-    :param map: The 2D map of the game
+    :param map: The game map
     :param bot_ids: Dictionary containing the IDs of the bots
     :param bot_current_positions: Dictionary containing the current positions of the bots
     :param bot_directions: Dictionary containing the directions in which the bots are moving
@@ -165,16 +251,15 @@ def move_bots(map: list, bot_ids: dict, bot_current_positions: dict, bot_directi
     bot_final_positions = calculate_final_bot_positions(map, bot_ids, bot_current_positions, bot_directions)
     bot_fights(bot_ids, bot_current_positions, bot_final_positions, bot_food)
     
+    cols = map.cols
     for id in bot_ids.keys():
+        current = bot_current_positions[id][0] * cols + bot_current_positions[id][1]
         if bot_ids[id] == BOT_ALIVE:
-            if map[bot_final_positions[id][0]][bot_final_positions[id][1]] == FOOD_CELL:
-                bot_food[id] += 1
-
-            if map[bot_current_positions[id][0]][bot_current_positions[id][1]] == str(id):
-                map[bot_current_positions[id][0]][bot_current_positions[id][1]] = WALKABLE_CELL
+            final = bot_final_positions[id][0] * cols + bot_final_positions[id][1]
+            map.vacate(current, id)
             bot_current_positions[id] = bot_final_positions[id]   # Update the current position
-            map[bot_final_positions[id][0]][bot_final_positions[id][1]] = str(id)    # Update the map
+            if map.occupy(final, id):    # Update the map, the bot eats the food on its final cell
+                bot_food[id] += 1
 
         else:
-            if map[bot_current_positions[id][0]][bot_current_positions[id][1]] == str(id):
-                map[bot_current_positions[id][0]][bot_current_positions[id][1]] = WALKABLE_CELL
\ No newline at end of file
+            map.vacate(current, id)
\ No newline at end of file
@@ -0,0 +1,267 @@
+import multiprocessing
+import os
+import random
+import signal
+import struct
+import time
+from array import array
+from typing import Optional
+from constants import *
+from bots.bot import Bot
+from modules.game_map import GameMap, MinimapView
+from modules.bot_operations import get_minimap, get_minimaps
+from modules.time_budget import BotTimeBudget
+
+# Tick message of a bot, all little endian:
+#   header: x, y (int32), minimap rows and cols (uint8), number of bot cells in the minimap (uint16),
+#           number of food counts (uint16)
+#   minimap: rows * cols cell codes (uint8), BOT_CELL_CODE where a bot stands
+#   bot cells: (cell index in the minimap (uint8), bot id (uint16)) for every bot cell
+#   food: food count (uint32) of bots 1, 2, ... in order
+# A worker process receives one batch per tick, the tick message of each of its alive bots prefixed
+# with (bot id (uint16), message length (uint32)), and replies with (bot id (uint16), direction (uint8),
+# 1 if the move ran over its time limit else 0 (uint8)) per bot. An empty batch asks the worker to exit.
+TICK_HEADER = struct.Struct('<iiBBHH')
+BOT_CELL = struct.Struct('<BH')
+BOT_CELL_CODE = 255
+BATCH_ENTRY = struct.Struct('<HI')
+REPLY = struct.Struct('<HBB')
+
+# Wall clock seconds the engine waits for a move of a bot without a move time limit before killing its process
+DEFAULT_HARD_TIMEOUT = 5.0
+# Seconds the engine waits past the hard timeout of a worker's bots before killing its process
+HARD_TIMEOUT_GRACE = 1.0
+
+# Encode the tick message of a bot
+def encode_tick(x: int, y: int, minimap: list, food: array) -> bytes:
+    """
+    :param x: Current x coordinate of the bot
+    :param y: Current y coordinate of the bot
+    :param minimap: Minimap of the bot (list of lists of string cells)
+    :param food: Food count of bots 1, 2, ... as array('I')
+    """
+    codes = bytearray()
+    bot_cells = []
+    for row in minimap:
+        for cell in row:
+            code = CELL_CODES.get(cell)
+            if code is None:
+                bot_cells.append(BOT_CELL.pack(len(codes), int(cell)))
+                code = BOT_CELL_CODE
+            codes.append(code)
+    header = TICK_HEADER.pack(x, y, len(minimap), len(minimap[0]) if minimap else 0, len(bot_cells), len(food))
+    return b''.join((header, codes, *bot_cells, food.tobytes()))
+
+# Decode a tick message, reusing the minimap lists of the previous tick when they have the same shape
+def decode_tick(message: bytes, minimap: list) -> tuple:
+    """
+    :param message: Tick message from encode_tick()
+    :param minimap: Minimap of the previous tick, or None
+    :return: (x, y, minimap, bot_food)
+    """
+    x, y, rows, cols, num_bot_cells, num_food = TICK_HEADER.unpack_from(message)
+    offset = TICK_HEADER.size
+    if minimap is None or len(minimap) != rows or (rows and len(minimap[0]) != cols):
+        minimap = [[None] * cols for _ in range(rows)]
+    codes = message[offset:offset + rows * cols]
+    k = 0
+    for row in minimap:
+        for j in range(cols):
+            row[j] = CODE_CELLS[codes[k]] if codes[k] != BOT_CELL_CODE else None
+            k += 1
+    offset += rows * cols
+    for _ in range(num_bot_cells):
+        k, bot_id = BOT_CELL.unpack_from(message, offset)
+        minimap[k // cols][k % cols] = str(bot_id)
+        offset += BOT_CELL.size
+    food = array('I')
+    food.frombytes(message[offset:offset + 4 * num_food])
+    return x, y, minimap, {id: count for id, count in enumerate(food, start=1)}
+
+# Main loop of a worker process hosting some of the bots
+def _run_bots(conn, bot_specs: list, move_limit: Optional[float], game_limit: Optional[float]):
+    """
+    :param conn: Connection to the engine
+    :param bot_specs: (bot class, id, x, y, minimap, rows, cols, rng seed) of every bot of the worker
+    :param move_limit: CPU seconds a bot may spend on one move, None for no limit
+    :param game_limit: CPU seconds a bot may spend on all its moves of a game, None for no limit
+    """
+    signal.signal(signal.SIGINT, signal.SIG_IGN)    # Ctrl+C is handled by the engine, which then closes the sandbox
+    bots = {}
+    for bot_class, id, x, y, minimap, rows, cols, seed in bot_specs:
+        try:
+            bots[id] = bot_class(id, x, y, minimap, rows, cols)
+            bots[id].rng.seed(seed)
+        except Exception:
+            pass    # A bot that fails to start halts for the whole game
+    time_budget = BotTimeBudget(move_limit, game_limit)
+    minimaps = {}   # { bot id -> MinimapView } over the lists decode_tick() refills
+    while True:
+        try:
+            batch = conn.recv_bytes()
+        except (EOFError, OSError):
+            break
+        if not batch:
+            break
+        replies = []
+        offset = 0
+        while offset < len(batch):
+            id, length = BATCH_ENTRY.unpack_from(batch, offset)
+            offset += BATCH_ENTRY.size
+            minimap = minimaps.get(id)
+            x, y, cells, bot_food = decode_tick(batch[offset:offset + length], minimap.cells if minimap is not None else None)
+            if minimap is None or minimap.cells is not cells:
+                minimaps[id] = MinimapView(cells)
+            offset += length
+            direction, overran = MOVE_HALT, False
+            if id in bots:
+                overruns = time_budget.overruns[id]
+                direction = time_budget.move(id, bots[id].move, current_x=x, current_y=y, minimap=minimaps[id], bot_food=bot_food)
+                overran = time_budget.overruns[id] > overruns
+                try:
+                    direction = int(direction) if direction in MOVEMENTS else MOVE_HALT
+                except TypeError:   # Unhashable direction
+                    direction = MOVE_HALT
+            replies.append(REPLY.pack(id, direction, overran))
+        conn.send_bytes(b''.join(replies))
+
+# Bots of a game, running in child processes
+class BotSandbox:
+    """
+    Out of process replacement of load_bots() and calculate_bot_directions(). Bots live in child
+    processes and only see the tick message built from their position, minimap and the food of all
+    bots, so they cannot touch the engine's state, and a crash or a hang only halts the bots of
+    that process.
+
+    By default every bot gets its own process. With workers, the bots are pinned to a fixed pool of
+    worker processes (bot i to worker (i-1) % workers) which run their bots one after the other.
+    A tick sends every worker its batch first and then collects the replies, so the tick takes about
+    as long as the slowest worker rather than the sum of all bots.
+
+    Within a process the time limits work like BotTimeBudget: they are CPU time, measured and
+    enforced by the worker itself, so a bot is not penalised for waiting on a busy machine. The
+    engine only keeps a wall clock backstop for workers that stop replying: each of a worker's
+    bots gets its move time limit (DEFAULT_HARD_TIMEOUT seconds if there is none), scaled by the
+    number of workers sharing a CPU core, plus HARD_TIMEOUT_GRACE seconds. A worker that does not
+    reply in time is killed, and its bots play MOVE_HALT for the rest of the game.
+    """
+
+    def __init__(self, bot_positions: dict, map: GameMap, bot_classes: list = None, rng=random,
+                 move_time_limit: Optional[float] = None, game_time_limit: Optional[float] = None, workers: int = None):
+        """
+        Start the bot processes, bot i is an instance of the i-th bot class like in load_bots().
+        Bots get the same rng seeds as with load_bots(), so a game plays the same in all modes.
+        :param bot_positions: Dictionary containing the starting positions of the bots
+        :param map: The game map
+        :param bot_classes: Bot classes to play, all bots from the bots folder if not given
+        :param rng: random.Random instance of the game (or the random module)
+        :param move_time_limit: CPU seconds a bot may spend on one move, None for no limit
+        :param game_time_limit: CPU seconds a bot may spend on all its moves of a game, None for no limit
+        :param workers: Number of worker processes, one per bot if None
+        """
+        if workers is not None and workers < 1:
+            raise ValueError("Number of workers should be greater than 0.")
+        bot_modules = bot_classes if bot_classes is not None else Bot.__subclasses__()
+        num_workers = len(bot_positions) if workers is None else min(workers, len(bot_positions))
+        self.move_time_limit = move_time_limit
+        self._core_share = -(-num_workers // (os.cpu_count() or 1))    # Workers sharing a CPU core, rounded up
+        self.bot_names = {}
+        self.overruns = {}      # { bot_id -> moves replaced by MOVE_HALT for running out of time }
+        self.crashed = set()    # Bots whose process died or was killed
+        self._worker_of = {}    # { bot_id -> worker index }
+        self._minimaps = {}
+        bot_specs = [[] for _ in range(num_workers)]
+        for ind, (x, y) in bot_positions.items():
+            bot_class = bot_modules[(ind-1) % len(bot_modules)]
+            self.bot_names[ind] = bot_class.__name__
+            self._worker_of[ind] = (ind-1) % num_workers
+            bot_specs[self._worker_of[ind]].append((bot_class, ind, x, y, get_minimap(map, x, y), len(map), len(map[0]), rng.getrandbits(64)))
+
+        context = multiprocessing.get_context()
+        self._connections = []
+        self._processes = []
+        for specs in bot_specs:
+            parent_conn, child_conn = context.Pipe()
+            process = context.Process(target=_run_bots, args=(child_conn, specs, move_time_limit, game_time_limit), daemon=True)
+            process.start()
+            child_conn.close()
+            self._connections.append(parent_conn)
+            self._processes.append(process)
+        self._dead_workers = set()
+
+    def _kill(self, worker: int):
+        self._dead_workers.add(worker)
+        self.crashed.update(id for id, w in self._worker_of.items() if w == worker)
+        self._processes[worker].kill()
+        self._processes[worker].join()
+        self._connections[worker].close()
+
+    def directions(self, map: GameMap, bot_positions: dict, bot_ids: dict, bot_food: dict) -> dict:
+        """
+        Calculate the next move for each alive bot, like calculate_bot_directions()
+        :param map: The game map
+        :param bot_positions: Dictionary containing bot positions
+        :param bot_ids: Dictionary containing bot ids
+        :param bot_food: Dictionary containing { bot_id -> food count } mapping
+        """
+        minimaps = get_minimaps(map, bot_positions, bot_ids, self._minimaps)
+        food = array('I', (bot_food[id] for id in range(1, len(bot_food) + 1)))
+        bot_directions = {}
+        batches = {}
+        for id, minimap in minimaps.items():
+            bot_directions[id] = MOVE_HALT
+            if id not in self.crashed:
+                message = encode_tick(bot_positions[id][0], bot_positions[id][1], minimap, food)
+                batches.setdefault(self._worker_of[id], []).extend((BATCH_ENTRY.pack(id, len(message)), message))
+
+        # Every worker's deadline starts when its batch is sent, not when the engine gets to its reply
+        move_timeout = self.move_time_limit if self.move_time_limit is not None else DEFAULT_HARD_TIMEOUT
+        deadlines = {}
+        for worker, batch in batches.items():
+            try:
+                self._connections[worker].send_bytes(b''.join(batch))
+                deadlines[worker] = time.monotonic() + move_timeout * self._core_share * (len(batch) // 2) + HARD_TIMEOUT_GRACE
+            except (BrokenPipeError, OSError):
+                self._kill(worker)
+
+        for worker, deadline in deadlines.items():
+            conn = self._connections[worker]
+            try:
+                if not conn.poll(max(0.0, deadline - time.monotonic())):
+                    for id in self.bot_names:
+                        if self._worker_of[id] == worker and id in minimaps:
+                            self.overruns[id] = self.overruns.get(id, 0) + 1
+                    self._kill(worker)
+                    continue
+                replies = conn.recv_bytes()
+            except (EOFError, OSError):
+                self._kill(worker)
+                continue
+            for id, direction, overran in REPLY.iter_unpack(replies):
+                bot_directions[id] = direction
+                if overran:
+                    self.overruns[id] = self.overruns.get(id, 0) + 1
+        return bot_directions
+
+    def close(self):
+        """
+        Stop all the bot processes
+        """
+        for worker, conn in enumerate(self._connections):
+            if worker not in self._dead_workers:
+                try:
+                    conn.send_bytes(b'')
+                except (BrokenPipeError, OSError):
+                    pass
+        for process, conn in zip(self._processes, self._connections):
+            process.join(timeout=HARD_TIMEOUT_GRACE)
+            if process.is_alive():
+                process.kill()
+                process.join()
+            conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,75 @@
+import pygame
+from constants import *
+
+# Rendering constants for the pygame UI. The engine and the bots only need constants.py,
+# so pygame is never imported or initialised by headless runs. The screen dimensions are
+# looked up lazily, the first time one of them is accessed.
+# (YOU CAN CHANGE THESE VALUES)
+
+# Define colors - Updated for better visual appeal and reduced eye strain
+# Soft, muted colors for better contrast and reduced eye strain
+WALKABLE_CELL_COLOR = (200, 230, 200)  # Soft mint green for walkable areas
+OUT_OF_BOUNDS_COLOR = (40, 40, 40)      # Dark gray for out of bounds
+MOUNTAIN_CELL_COLOR = (180, 120, 100)   # Warm brown for mountains
+FOOD_CELL_COLOR = (255, 215, 0)         # Soft gold for food
+PLAYER_CELL_COLOR = (255, 255, 255)     # White for player cells
+UNKNOWN_CELL_COLOR = (180, 180, 180)    # Light gray for unknown cells
+BACKGROUND_COLOR = (25, 25, 35)         # Dark blue-gray for background
+TEXT_COLOR = (230, 230, 230)            # Soft white for text
+BORDER_COLOR = (60, 60, 70)             # Dark gray for borders
+
+COLOR_MAP = {
+    WALKABLE_CELL: WALKABLE_CELL_COLOR,
+    OUT_OF_BOUNDS_CELL: OUT_OF_BOUNDS_COLOR,
+    MOUNTAIN_CELL: MOUNTAIN_CELL_COLOR,
+    FOOD_CELL: FOOD_CELL_COLOR,
+    PLAYER_CELL: PLAYER_CELL_COLOR,
+    UNKNOWN_CELL: UNKNOWN_CELL_COLOR
+}
+
+_SCREEN_CONSTANTS = ('SCREEN_WIDTH', 'SCREEN_HEIGHT', 'WINDOW_SIZE', 'WIDTH', 'HEIGHT', 'CELL_SIZE')
+_screen_constants = None
+
+__all__ = list(_SCREEN_CONSTANTS) + [
+    'WALKABLE_CELL_COLOR', 'OUT_OF_BOUNDS_COLOR', 'MOUNTAIN_CELL_COLOR', 'FOOD_CELL_COLOR',
+    'PLAYER_CELL_COLOR', 'UNKNOWN_CELL_COLOR', 'BACKGROUND_COLOR', 'TEXT_COLOR', 'BORDER_COLOR', 'COLOR_MAP',
+    'get_cell_size'
+]
+
+# Compute the screen dimensions from the current display
+def get_screen_constants() -> dict:
+    """
+    Initialise pygame and compute the window dimensions, only once per process.
+    """
+    global _screen_constants
+    if _screen_constants is None:
+        pygame.init()
+        info = pygame.display.Info()
+        screen_width = info.current_w
+        screen_height = info.current_h
+        # Calculate window size as 80% of the smaller screen dimension
+        window_size = min(screen_width, screen_height) * 0.8
+        _screen_constants = {
+            'SCREEN_WIDTH': screen_width,
+            'SCREEN_HEIGHT': screen_height,
+            'WINDOW_SIZE': window_size,
+            'WIDTH': int(window_size),
+            'HEIGHT': int(window_size),
+            'CELL_SIZE': int(window_size) // COLS,
+        }
+    return _screen_constants
+
+# Size of a board cell on the screen
+def get_cell_size(rows: int, cols: int) -> int:
+    """
+    Side of one cell in pixels so that a board with the given number of rows and columns fits the window
+    :param rows: Number of rows of the board
+    :param cols: Number of columns of the board
+    """
+    screen = get_screen_constants()
+    return max(1, min(screen['WIDTH'] // cols, screen['HEIGHT'] // rows))
+
+def __getattr__(name):
+    if name in _SCREEN_CONSTANTS:
+        return get_screen_constants()[name]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,29 +1,29 @@
 import random
 from constants import *
+from modules.game_map import GameMap
 
 # Function to generate food items on the map
 # (DO NOT CHANGE THIS, YOUR CHANGES WILL BE IGNORED IN THE COMPETITION)
-def generate_food(map: list, quantity: int):
+def generate_food(map: GameMap, quantity: int, rng=random) -> list:
     """
     Generate new food items on the map after all the bots have moved.
-    :param map: 2D list representing the game map
+    :param map: The game map
     :param quantity: Number of food items to generate
+    :param rng: random.Random instance of the game (or the random module)
+    :return: flat indices of the cells that got food, in the order they got it
     """
-    length, breadth = len(map), len(map[0])
     if quantity < 0:
         raise ValueError("Quantity should be greater than 0.")
     
-    num_of_walkable_cells = 0
-    for i in range(length):
-        for j in range(breadth):
-            if map[i][j] == WALKABLE_CELL:
-                num_of_walkable_cells += 1
+    num_of_walkable_cells = map.free_count   # Kept up to date by the map, no scan needed
 
     quantity = min(quantity, num_of_walkable_cells//2)  # Generate food items on maximum half of the walkable cells
 
+    # Every draw is a uniformly random free cell, the same distribution as retrying random cells
+    # until one is walkable, without the wasted draws on large sparse maps
+    food_cells = []
     for _ in range(quantity):
-        while True:
-            x, y = random.randint(0, length-1), random.randint(0, breadth-1)
-            if map[x][y] == WALKABLE_CELL:  # Generate food item on a walkable cell
-                map[x][y] = FOOD_CELL
-                break
\ No newline at end of file
+        k = map.free_cells.choice(rng)
+        map.add_food(k)
+        food_cells.append(k)
+    return food_cells
\ No newline at end of file
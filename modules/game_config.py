@@ -0,0 +1,48 @@
+from dataclasses import dataclass
+from typing import Optional
+from constants import ROWS, COLS, MAX_OUT_OF_BOUND_PROBABILITY
+
+# Parameters of a game
+@dataclass
+class GameConfig:
+    """
+    Everything that shapes a game, passed to generate_map(), simulate.py and main().
+    The defaults are the standard competition settings.
+    """
+    rows: int = ROWS                            # Number of rows of the board
+    cols: int = COLS                            # Number of columns of the board
+    number_of_bots: Optional[int] = None        # Bots in the game, None for one bot per bot class in the bots folder
+    out_of_bounds_probability: float = 0.6      # Probability of an edge cell being out_of_bounds
+    mountain_probability: float = 0.6           # Probability of a mountain growing by one more cell
+    mountain_coverage: int = 200                # Number of mountain cells to be generated
+    min_mountain_size: int = 10                 # Minimum size of a mountain cluster
+    max_mountain_size: int = 20                 # Maximum size of a mountain cluster
+    max_game_moves: int = 1000                  # Moves before the game ends on score
+    max_food_percentage: float = 0.15           # No food is generated while this share of the board is food
+    food_generation_quantity_per_bot: int = 1   # Food generated per alive bot in a turn
+    move_time_limit: Optional[float] = None     # CPU seconds a bot may spend on one move, None for no limit
+    game_time_limit: Optional[float] = None     # CPU seconds a bot may spend on all its moves, None for no limit
+    sandbox_bots: bool = False                  # Run every bot in its own process (modules/bot_sandbox.py)
+    decision_workers: int = 0                   # Bots deciding their moves at the same time, 0 for one after the other. Threads on
+                                                # free-threaded Python, else a pool of sandbox processes with the bots pinned to them
+    vectorized_moves: bool = False              # Resolve moves with NumPy (modules/vector_resolver.py), same results as move_bots()
+
+    def __post_init__(self):
+        # The engine relies on the out of bounds border of the map to keep moves on the board,
+        # and generate_random_shaped_map() leaves it out when the probability is 0
+        if not 0 < self.out_of_bounds_probability <= MAX_OUT_OF_BOUND_PROBABILITY:
+            raise ValueError(f"Out of bounds probability should be greater than 0 and at most {MAX_OUT_OF_BOUND_PROBABILITY}.")
+
+    def map_params(self) -> dict:
+        """
+        Keyword arguments of generate_map() for this config
+        """
+        return {
+            'out_of_bounds_probability': self.out_of_bounds_probability,
+            'mountain_probability': self.mountain_probability,
+            'mountain_coverage': self.mountain_coverage,
+            'rows': self.rows,
+            'cols': self.cols,
+            'min_mountain_size': self.min_mountain_size,
+            'max_mountain_size': self.max_mountain_size,
+        }
@@ -0,0 +1,392 @@
+from array import array
+from constants import *
+
+# Cell codes that a bot can never move into
+BLOCKED_CODES = (MOUNTAIN_CODE, OUT_OF_BOUNDS_CODE)
+
+# Translation tables from string cells to cell codes, and to nothing to spot non terrain cells
+_CELL_CODE_TABLE = bytes(CELL_CODES.get(chr(c), UNKNOWN_CODE) for c in range(256))
+_CELL_DELETION_TABLE = {ord(cell): None for cell in CODE_CELLS}
+
+# Set of flat cell indices with O(1) add, remove and uniform random choice
+class CellIndex:
+    """
+    Cells are kept densely packed in `cells`, and `positions` maps every flat index of
+    the board to its slot in `cells` (-1 if absent). Removing a cell moves the last cell
+    into its slot, so the set never has holes and a random slot is a uniform random cell.
+    """
+    __slots__ = ('cells', 'positions')
+
+    def __init__(self, size: int, cells=()):
+        """
+        Create the index for a board of the given number of cells
+        :param size: Number of cells of the board
+        :param cells: Flat indices initially in the set
+        """
+        self.cells = array('i', cells)
+        self.positions = array('i', [-1]) * size
+        for slot, k in enumerate(self.cells):
+            self.positions[k] = slot
+
+    def copy(self) -> 'CellIndex':
+        index = CellIndex.__new__(CellIndex)
+        index.cells = array('i', self.cells)
+        index.positions = array('i', self.positions)
+        return index
+
+    def __len__(self):
+        return len(self.cells)
+
+    def __contains__(self, k: int):
+        return self.positions[k] >= 0
+
+    def add(self, k: int):
+        if self.positions[k] < 0:
+            self.positions[k] = len(self.cells)
+            self.cells.append(k)
+
+    def remove(self, k: int):
+        slot = self.positions[k]
+        if slot >= 0:
+            last = self.cells.pop()
+            if last != k:
+                self.cells[slot] = last
+                self.positions[last] = slot
+            self.positions[k] = -1
+
+    def choice(self, rng) -> int:
+        """
+        Uniformly random cell of the set
+        :param rng: random.Random instance (or the random module)
+        """
+        return self.cells[rng.randrange(len(self.cells))]
+
+# Array backed game map
+class GameMap:
+    """
+    Game board stored as two flat arrays instead of a list of lists of strings.
+    terrain holds one cell code per cell (see CELL_CODES in constants.py) and occupancy
+    holds the id of the bot standing on the cell, 0 if the cell is empty. Cell (i, j)
+    lives at flat index i * cols + j in both arrays.
+
+    map[i][j] still reads and writes the old string cells (bots show up as str(id)),
+    so code written against the list of lists keeps working unchanged.
+
+    food_count and free_cells (the walkable cells without a bot) are kept up to date by
+    every write that goes through the methods below, so they never need a scan of the
+    board, and a random free cell is picked in O(1). Bots always stand on walkable terrain.
+
+    After track_changes(), the same writes also collect the flat indices of the cells they
+    touch in `changes`, which take_changes() hands out and resets (used by the renderer to
+    redraw only those cells). Changes are not tracked by default.
+    """
+    __slots__ = ('rows', 'cols', 'terrain', 'occupancy', 'food_count', 'free_cells', 'changes')
+
+    def __init__(self, rows: int, cols: int, terrain: bytearray = None, occupancy: array = None):
+        """
+        Create a map of the given size
+        :param rows: Number of rows of the map
+        :param cols: Number of columns of the map
+        :param terrain: Flat cell codes of the map, all walkable if not given
+        :param occupancy: Flat bot ids of the map, no bots if not given
+        """
+        if rows < 1 or cols < 1:
+            raise ValueError("Rows and cols should be greater than 0.")
+        size = rows * cols
+        if terrain is not None and len(terrain) != size:
+            raise ValueError(f"Terrain should have {size} cells.")
+        if occupancy is not None and len(occupancy) != size:
+            raise ValueError(f"Occupancy should have {size} cells.")
+        self.rows = rows
+        self.cols = cols
+        self.terrain = bytearray(size) if terrain is None else terrain
+        self.occupancy = array('H', bytes(2 * size)) if occupancy is None else occupancy
+        self.food_count = self.terrain.count(FOOD_CODE)
+        terrain, occupancy = self.terrain, self.occupancy
+        self.free_cells = CellIndex(size, [k for k, code in enumerate(terrain) if code == WALKABLE_CODE and not occupancy[k]])
+        self.changes = None
+
+    @classmethod
+    def from_rows(cls, rows: list) -> 'GameMap':
+        """
+        Build a map from the list of lists of string cells
+        :param rows: 2D list representing the game map
+        """
+        cells = ''.join([''.join(row) for row in rows])
+        if len(cells) == len(rows) * len(rows[0]) and not cells.translate(_CELL_DELETION_TABLE):
+            # Only terrain cells (no bots), translate the whole board at once
+            return cls(len(rows), len(rows[0]), bytearray(cells.encode('latin-1').translate(_CELL_CODE_TABLE)))
+        game_map = cls(len(rows), len(rows[0]))
+        for i, row in enumerate(rows):
+            for j, cell in enumerate(row):
+                game_map.set_cell(i, j, cell)
+        return game_map
+
+    def to_rows(self) -> list:
+        """
+        Convert the map back to a list of lists of string cells
+        """
+        return [[self.cell_at(i * self.cols + j) for j in range(self.cols)] for i in range(self.rows)]
+
+    def copy(self) -> 'GameMap':
+        game_map = GameMap.__new__(GameMap)
+        game_map.rows, game_map.cols = self.rows, self.cols
+        game_map.terrain = bytearray(self.terrain)
+        game_map.occupancy = array('H', self.occupancy)
+        game_map.food_count = self.food_count
+        game_map.free_cells = self.free_cells.copy()
+        game_map.changes = None
+        return game_map
+
+    def track_changes(self):
+        """
+        Start collecting the cells changed by the writes to the map
+        """
+        if self.changes is None:
+            self.changes = set()
+
+    def take_changes(self) -> set:
+        """
+        Flat indices of the cells changed since the last call (or since track_changes())
+        """
+        changes = self.changes
+        self.changes = set()
+        return changes
+
+    @property
+    def free_count(self) -> int:
+        return len(self.free_cells)
+
+    def index(self, i: int, j: int) -> int:
+        return i * self.cols + j
+
+    def cell_at(self, k: int) -> str:
+        """
+        String cell at the flat index k
+        """
+        bot_id = self.occupancy[k]
+        return str(bot_id) if bot_id else CODE_CELLS[self.terrain[k]]
+
+    def set_cell_at(self, k: int, cell: str):
+        """
+        Write a string cell at the flat index k. A bot id puts that bot on a walkable cell.
+        """
+        code = CELL_CODES.get(cell)
+        bot_id = 0
+        if code is None:
+            code = WALKABLE_CODE
+            bot_id = int(cell)
+        self.food_count += (code == FOOD_CODE) - (self.terrain[k] == FOOD_CODE)
+        self.terrain[k] = code
+        self.occupancy[k] = bot_id
+        if self.changes is not None:
+            self.changes.add(k)
+        if code == WALKABLE_CODE and not bot_id:
+            self.free_cells.add(k)
+        else:
+            self.free_cells.remove(k)
+
+    def add_food(self, k: int):
+        """
+        Spawn food on the free cell at the flat index k
+        """
+        self.terrain[k] = FOOD_CODE
+        self.food_count += 1
+        self.free_cells.remove(k)
+        if self.changes is not None:
+            self.changes.add(k)
+
+    def occupy(self, k: int, bot_id: int) -> bool:
+        """
+        Put a bot on the cell at the flat index k, eating the food there.
+        Returns True if the bot ate food.
+        """
+        ate_food = False
+        if self.terrain[k] == FOOD_CODE:
+            self.terrain[k] = WALKABLE_CODE
+            self.food_count -= 1
+            ate_food = True
+        elif not self.occupancy[k]:
+            self.free_cells.remove(k)
+        self.occupancy[k] = bot_id
+        if self.changes is not None:
+            self.changes.add(k)
+        return ate_food
+
+    def vacate(self, k: int, bot_id: int):
+        """
+        Remove a bot from the cell at the flat index k, if it is still the one standing there
+        """
+        if self.occupancy[k] == bot_id:
+            self.occupancy[k] = 0
+            self.free_cells.add(k)
+            if self.changes is not None:
+                self.changes.add(k)
+
+    def get_cell(self, i: int, j: int) -> str:
+        return self.cell_at(i * self.cols + j)
+
+    def set_cell(self, i: int, j: int, cell: str):
+        self.set_cell_at(i * self.cols + j, cell)
+
+    def fill_minimap(self, minimap: list, x: int, y: int) -> bool:
+        """
+        Overwrite the square minimap (list of lists of string cells) centered on (x, y) in place,
+        so a bot can be handed the same lists every tick. Returns False, leaving the minimap
+        untouched, if the square does not fit on the board.
+        """
+        half_size = len(minimap) // 2
+        top, left = x - half_size, y - half_size
+        if top < 0 or left < 0 or top + len(minimap) > self.rows or left + len(minimap[0]) > self.cols:
+            return False
+        terrain, occupancy, cols = self.terrain, self.occupancy, self.cols
+        k = top * cols + left
+        for row in minimap:
+            for j in range(len(row)):
+                bot_id = occupancy[k + j]
+                row[j] = str(bot_id) if bot_id else CODE_CELLS[terrain[k + j]]
+            k += cols
+        return True
+
+    def is_free(self, k: int) -> bool:
+        """
+        True if the cell at the flat index k is walkable and no bot stands on it
+        """
+        return self.terrain[k] == WALKABLE_CODE and not self.occupancy[k]
+
+    def count(self, cell: str) -> int:
+        """
+        Number of cells holding the given string cell
+        """
+        code = CELL_CODES.get(cell)
+        if code is None:
+            return self.occupancy.count(int(cell))
+        if code == WALKABLE_CODE:
+            return self.free_count
+        if code == FOOD_CODE:
+            return self.food_count
+        return self.terrain.count(code)
+
+    # List of lists compatibility
+    def __len__(self):
+        return self.rows
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [_MapRow(self, r) for r in range(*i.indices(self.rows))]
+        if i < 0:
+            i += self.rows
+        if not 0 <= i < self.rows:
+            raise IndexError("map row index out of range")
+        return _MapRow(self, i)
+
+    def __iter__(self):
+        for i in range(self.rows):
+            yield _MapRow(self, i)
+
+
+# Row of a GameMap that behaves like a list of string cells
+class _MapRow:
+    __slots__ = ('_map', '_base')
+
+    def __init__(self, game_map: GameMap, i: int):
+        self._map = game_map
+        self._base = i * game_map.cols
+
+    def _index(self, j: int) -> int:
+        cols = self._map.cols
+        if j < 0:
+            j += cols
+        if not 0 <= j < cols:
+            raise IndexError("map column index out of range")
+        return self._base + j
+
+    def __len__(self):
+        return self._map.cols
+
+    def __getitem__(self, j):
+        if isinstance(j, slice):
+            return [self._map.cell_at(self._base + c) for c in range(*j.indices(self._map.cols))]
+        return self._map.cell_at(self._index(j))
+
+    def __setitem__(self, j, cell):
+        self._map.set_cell_at(self._index(j), cell)
+
+    def __iter__(self):
+        for c in range(self._map.cols):
+            yield self._map.cell_at(self._base + c)
+
+    def count(self, cell: str) -> int:
+        return sum(1 for value in self if value == cell)
+
+    def __eq__(self, other):
+        return list(self) == list(other)
+
+    def __repr__(self):
+        return repr(list(self))
+
+# Read-only minimap handed to a bot
+class MinimapView(tuple):
+    """
+    Tuple of read-only row views over a minimap buffer (list of lists of string cells) that
+    the engine refills in place every tick with GameMap.fill_minimap(view.cells, x, y).
+    minimap[i][j], len(), iteration and slicing (which copies) work like on the lists, but any
+    write raises TypeError, so a bot that tries to edit the minimap it was handed notices that
+    it is shared. A view shows the cells of the current tick, keep a copy (row[:]) to remember
+    an older minimap.
+    """
+
+    def __new__(cls, cells: list):
+        """
+        :param cells: The minimap buffer, a list of lists of string cells
+        """
+        view = super().__new__(cls, [_MinimapRow(row) for row in cells])
+        view.cells = cells
+        return view
+
+    def __eq__(self, other):
+        return len(self) == len(other) and all(row == other_row for row, other_row in zip(self, other))
+
+    def __ne__(self, other):
+        return not self == other
+
+    __hash__ = None     # The cells change every tick
+
+    def __repr__(self):
+        return repr([list(row) for row in self])
+
+# Row of a MinimapView
+class _MinimapRow:
+    __slots__ = ('_cells',)
+
+    def __init__(self, cells: list):
+        self._cells = cells
+
+    def __len__(self):
+        return len(self._cells)
+
+    def __getitem__(self, j):
+        return self._cells[j]
+
+    def __iter__(self):
+        return iter(self._cells)
+
+    def __contains__(self, cell):
+        return cell in self._cells
+
+    def index(self, cell, *args) -> int:
+        return self._cells.index(cell, *args)
+
+    def count(self, cell: str) -> int:
+        return self._cells.count(cell)
+
+    def __eq__(self, other):
+        return list(self._cells) == list(other)
+
+    def __ne__(self, other):
+        return not self == other
+
+    __hash__ = None
+
+    def __repr__(self):
+        return repr(self._cells)
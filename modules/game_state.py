@@ -0,0 +1,127 @@
+import pickle
+import random
+import struct
+from array import array
+from typing import NamedTuple, Optional
+from modules.game_map import GameMap, CellIndex
+
+# Live objects of a game, as returned by GameState.restore()
+class Game(NamedTuple):
+    map: GameMap
+    bot_positions: dict
+    bot_ids: dict
+    bot_food: dict
+    moves_left: int
+    rng: Optional[random.Random]
+    bots: Optional[dict]
+
+# Serialised GameState, all little endian:
+#   header: magic, rows, cols (uint32), number of bots (uint32), moves left (int64), number of free cells (uint32),
+#           length of the pickled rng state and bots (uint32 each, 0 if not captured)
+#   terrain (rows * cols uint8), occupancy (rows * cols uint16), free cells in index order (int32)
+#   bot ids (uint16), alive flags (uint8), x and y (int32 each), food (int64) of every bot
+#   pickled rng state, pickled bots
+GAME_STATE_MAGIC = b'PMWSTAT\x00'
+GAME_STATE_HEADER = struct.Struct('<8sIIIqIII')
+
+# Snapshot of a game
+class GameState:
+    """
+    Immutable snapshot of everything a game is made of: the map (with its food counter and the
+    order of its free cell index, so food spawns after a restore are the same), the positions,
+    status and food of the bots, the moves left and optionally the game's random generator and
+    the bot objects themselves.
+
+    Capturing copies a few flat buffers, and every restore() makes fresh live copies from them,
+    so thousands of rollouts can be forked from one snapshot without copy.deepcopy. Bots, when
+    captured, are pickled once and unpickled on every restore.
+    """
+    __slots__ = ('_map', '_ids', '_alive', '_positions', '_food', 'moves_left', '_rng_state', '_bots')
+
+    def __init__(self, map: GameMap, bot_positions: dict, bot_ids: dict, bot_food: dict, moves_left: int = 0,
+                 rng: random.Random = None, bots: dict = None):
+        """
+        Capture the state of a game
+        :param map: The game map
+        :param bot_positions: Dictionary containing bot positions
+        :param bot_ids: Dictionary containing the ALIVE/DEAD status of the bots
+        :param bot_food: Dictionary containing { bot_id -> food count } mapping
+        :param moves_left: Moves left before the game ends on score
+        :param rng: random.Random instance of the game, not captured if None
+        :param bots: Dictionary containing bot objects, not captured if None
+        """
+        self._map = map.copy()
+        self._ids = array('H', bot_ids.keys())
+        self._alive = array('B', bot_ids.values())
+        self._positions = array('i', (c for id in self._ids for c in bot_positions[id]))
+        self._food = array('q', (bot_food[id] for id in self._ids))
+        self.moves_left = moves_left
+        self._rng_state = rng.getstate() if rng is not None else None
+        self._bots = pickle.dumps(bots, pickle.HIGHEST_PROTOCOL) if bots is not None else None
+
+    def restore(self) -> Game:
+        """
+        Fresh live copy of the captured game, the snapshot itself is left untouched
+        """
+        positions = self._positions
+        rng = None
+        if self._rng_state is not None:
+            rng = random.Random()
+            rng.setstate(self._rng_state)
+        return Game(
+            map=self._map.copy(),
+            bot_positions={id: [positions[2 * i], positions[2 * i + 1]] for i, id in enumerate(self._ids)},
+            bot_ids=dict(zip(self._ids, self._alive)),
+            bot_food=dict(zip(self._ids, self._food)),
+            moves_left=self.moves_left,
+            rng=rng,
+            bots=pickle.loads(self._bots) if self._bots is not None else None)
+
+    def to_bytes(self) -> bytes:
+        """
+        Serialise the snapshot
+        """
+        game_map = self._map
+        rng_state = pickle.dumps(self._rng_state, pickle.HIGHEST_PROTOCOL) if self._rng_state is not None else b''
+        bots = self._bots if self._bots is not None else b''
+        header = GAME_STATE_HEADER.pack(GAME_STATE_MAGIC, game_map.rows, game_map.cols, len(self._ids), self.moves_left,
+                                        len(game_map.free_cells), len(rng_state), len(bots))
+        return b''.join((header, game_map.terrain, game_map.occupancy.tobytes(), game_map.free_cells.cells.tobytes(),
+                         self._ids.tobytes(), self._alive.tobytes(), self._positions.tobytes(), self._food.tobytes(),
+                         rng_state, bots))
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> 'GameState':
+        """
+        Load a snapshot serialised with to_bytes()
+        """
+        magic, rows, cols, num_bots, moves_left, num_free, rng_length, bots_length = GAME_STATE_HEADER.unpack_from(data)
+        if magic != GAME_STATE_MAGIC:
+            raise ValueError("Not a serialised game state.")
+        view = memoryview(data)
+        offset = GAME_STATE_HEADER.size
+
+        def take(typecode: str, count: int) -> array:
+            nonlocal offset
+            values = array(typecode)
+            values.frombytes(view[offset:offset + count * values.itemsize])
+            offset += count * values.itemsize
+            return values
+
+        size = rows * cols
+        terrain = bytearray(view[offset:offset + size])
+        offset += size
+        game_map = GameMap(rows, cols, terrain, take('H', size))
+        game_map.free_cells = CellIndex(size, take('i', num_free))     # Keep the index order of the captured game
+
+        state = cls.__new__(cls)
+        state._map = game_map
+        state._ids = take('H', num_bots)
+        state._alive = take('B', num_bots)
+        state._positions = take('i', 2 * num_bots)
+        state._food = take('q', num_bots)
+        state.moves_left = moves_left
+        state._rng_state = pickle.loads(view[offset:offset + rng_length]) if rng_length else None
+        offset += rng_length
+        state._bots = bytes(view[offset:offset + bots_length]) if bots_length else None
+        return state
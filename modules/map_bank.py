@@ -0,0 +1,142 @@
+import hashlib
+import json
+import mmap
+import os
+import random
+import struct
+from modules.game_config import GameConfig
+from modules.game_map import GameMap
+from modules.map_generator import generate_map
+
+# A map bank is a pool of pre-generated maps stored in one binary file:
+#   header: magic, format version, rows, cols, number of maps, seed, length of the parameters
+#   the map parameters as JSON
+#   the terrain of every map, rows * cols cell codes (one byte each) per map, back to back
+# The file is memory-mapped for reading, so opening a bank is instant and workers share the pages.
+MAP_BANK_MAGIC = b'PMWBANK\x00'
+MAP_BANK_VERSION = 1
+MAP_BANK_HEADER = struct.Struct('<8sHIIIQI')
+
+# Number of maps of a bank when not given
+MAP_BANK_SIZE = 1000
+
+# Seed of the map at the given index of a bank
+def map_seed(seed: int, index: int) -> str:
+    """
+    Every map has its own seed, so map i of a bank does not depend on how many maps the bank holds
+    :param seed: Seed of the bank
+    :param index: Index of the map in the bank
+    """
+    return f"{seed}:{index}"
+
+# Name of the cache file of a bank
+def map_bank_path(cache_dir: str, count: int, seed: int, config: GameConfig) -> str:
+    """
+    Path of the bank file for the given parameters, the parameters are hashed into the file name
+    :param cache_dir: Directory holding the bank files
+    :param count: Number of maps in the bank
+    :param seed: Seed of the bank
+    :param config: Game settings the maps are generated with
+    """
+    params = json.dumps(config.map_params(), sort_keys=True)
+    key = hashlib.sha256(f"{MAP_BANK_VERSION}:{count}:{seed}:{params}".encode()).hexdigest()[:16]
+    return os.path.join(cache_dir, f"maps_{config.rows}x{config.cols}_{count}_{key}.bank")
+
+# Generate the maps of a bank and write them to disk
+def build_map_bank(path: str, count: int, seed: int, config: GameConfig):
+    """
+    Generate count maps and store them in a bank file. The file is written under a temporary
+    name and renamed at the end, so a half written bank is never picked up.
+    :param path: Path of the bank file
+    :param count: Number of maps to generate
+    :param seed: Seed of the bank
+    :param config: Game settings the maps are generated with
+    """
+    if count < 1:
+        raise ValueError("Number of maps should be greater than 0.")
+    params = json.dumps(config.map_params(), sort_keys=True).encode()
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    temporary_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(temporary_path, 'wb') as f:
+            f.write(MAP_BANK_HEADER.pack(MAP_BANK_MAGIC, MAP_BANK_VERSION, config.rows, config.cols, count, seed, len(params)))
+            f.write(params)
+            for index in range(count):
+                rng = random.Random(map_seed(seed, index))
+                f.write(generate_map(**config.map_params(), rng=rng).terrain)
+        os.replace(temporary_path, path)
+    finally:
+        if os.path.exists(temporary_path):
+            os.remove(temporary_path)
+
+# Read only pool of maps backed by a memory-mapped bank file
+class MapBank:
+    def __init__(self, path: str):
+        """
+        Open a bank file
+        :param path: Path of the bank file
+        """
+        self.path = path
+        with open(path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self.rows, self.cols, self.count, self.seed, params_length = MAP_BANK_HEADER.unpack_from(self._mmap)
+        if magic != MAP_BANK_MAGIC or version != MAP_BANK_VERSION:
+            self.close()
+            raise ValueError(f"{path} is not a version {MAP_BANK_VERSION} map bank.")
+        self.params = json.loads(self._mmap[MAP_BANK_HEADER.size:MAP_BANK_HEADER.size + params_length])
+        self._offset = MAP_BANK_HEADER.size + params_length
+        self._map_size = self.rows * self.cols
+        if len(self._mmap) != self._offset + self.count * self._map_size:
+            self.close()
+            raise ValueError(f"{path} is truncated.")
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, index: int) -> GameMap:
+        """
+        Fresh copy of the map at the given index, ready to be played on
+        """
+        if not 0 <= index < self.count:
+            raise IndexError("map bank index out of range")
+        start = self._offset + index * self._map_size
+        return GameMap(self.rows, self.cols, bytearray(memoryview(self._mmap)[start:start + self._map_size]))
+
+    def close(self):
+        self._mmap.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+# Banks already opened in this process, by path
+_open_map_banks = {}
+
+# Open a bank file once per process
+def open_map_bank(path: str) -> MapBank:
+    """
+    Open the bank file at the given path, later calls with the same path share the bank
+    :param path: Path of the bank file
+    """
+    if path not in _open_map_banks:
+        _open_map_banks[path] = MapBank(path)
+    return _open_map_banks[path]
+
+# Open a bank, generating it first if it is not cached yet
+def load_map_bank(cache_dir: str, count: int, seed: int, config: GameConfig) -> MapBank:
+    """
+    Open the bank for the given parameters from the cache directory, building it if needed
+    :param cache_dir: Directory holding the bank files
+    :param count: Number of maps in the bank
+    :param seed: Seed of the bank
+    :param config: Game settings the maps are generated with
+    """
+    path = map_bank_path(cache_dir, count, seed, config)
+    if not os.path.exists(path):
+        build_map_bank(path, count, seed, config)
+    return open_map_bank(path)
@@ -1,17 +1,19 @@
 import random
-import copy
-from constants import *
+import re
 from collections import deque
+from constants import *
+from modules.game_map import GameMap, CellIndex
 
 # Function to generate a random shaped map
 # (DO NOT CHANGE THIS, YOUR CHANGES WILL BE IGNORED IN THE COMPETITION)
-def generate_random_shaped_map(length: int, breadth: int, probability: float) -> list:
+def generate_random_shaped_map(length: int, breadth: int, probability: float, rng=random) -> list:
     """
     Generate a map of given length and breadth. Give shape to the map by marking
     edge cells as out_of_bounds with given succeeding probability.
     :param length: Length of the map
     :param breadth: Breadth of the map
     :param probability: Probability of a cell being out_of_bounds subsequent to the previous cell.
+    :param rng: random.Random instance of the game (or the random module)
     """
     if probability < 0 or probability > MAX_OUT_OF_BOUND_PROBABILITY:
         raise ValueError(f"Probability should be between 0 and {MAX_OUT_OF_BOUND_PROBABILITY}")
@@ -33,62 +35,158 @@ def generate_random_shaped_map(length: int, breadth: int, probability: float) ->
     
     for i in range(2, length-2):
         for j in range(2, breadth-3):
-            if random.random() > probability:   # Probability of a cell being out_of_bounds from left
+            if rng.random() > probability:   # Probability of a cell being out_of_bounds from left
                 break
             map[i][j] = OUT_OF_BOUNDS_CELL
 
         for j in range(2, breadth-3):
-            if map[i][breadth - j - 2] == OUT_OF_BOUNDS_CELL or random.random() > probability:   # Probability of a cell being out_of_bounds from right
+            if map[i][breadth - j - 2] == OUT_OF_BOUNDS_CELL or rng.random() > probability:   # Probability of a cell being out_of_bounds from right
                 break
             map[i][breadth - j - 1] = OUT_OF_BOUNDS_CELL
     return map
 
+# Horizontal run of green cells in a row joined into a string
+WALKABLE_RUN = re.compile(re.escape(WALKABLE_CELL) + '+')
+
 # Function to check if the generated map is valid or not
 # (DO NOT CHANGE THIS, YOUR CHANGES WILL BE IGNORED IN THE COMPETITION)
 def check_if_map_is_valid(map: list) -> bool:
     """
     Check if all the green cells are one connected component to ensure map is valid.
+    Every row is split into runs of green cells and the runs that touch a run of the
+    previous row are merged with union-find, so the work grows with the number of runs
+    rather than the number of cells and no copy of the map is needed.
     :param map: 2D list representing the game map
     """
-    def bfs(start_i, start_j):
-        queue = deque([(start_i, start_j)])
-        while queue:
-            i, j = queue.popleft()
-            if i < 0 or i >= len(map) or j < 0 or j >= len(map[0]) or map_copy[i][j] != WALKABLE_CELL:
-                continue
-            map_copy[i][j] = '0'
-            queue.append((i+1, j)) # Down
-            queue.append((i-1, j)) # Up
-            queue.append((i, j+1)) # Right
-            queue.append((i, j-1)) # Left
-    
-    # Create a deep copy of the map to avoid modifying the original map
-    map_copy = copy.deepcopy(map)
-    
-    # Find the first green cell and start bfs from there.
-    for j in range(len(map_copy[0])):
-        if map_copy[2][j] == WALKABLE_CELL:     # Start from 2nd row to avoid edge cells
-            bfs(2, j)
-            break
-    
-    # Check if all green cells are visited.
-    for i in range(len(map_copy)):
-        for j in range(len(map_copy[0])):
-            if map_copy[i][j] == WALKABLE_CELL:
-                return False
-    return True
+    parent = []     # Union-find forest over the runs
+    def find(run):
+        while parent[run] != run:
+            parent[run] = parent[parent[run]]
+            run = parent[run]
+        return run
+
+    num_of_components = 0
+    start_row_has_green_cell = False
+    previous_runs = []  # (start, end, run) of the previous row, sorted by start
+    for i, row in enumerate(map):
+        cells = ''.join(row)
+        if len(cells) != len(row):  # Multi character cells (bot ids), keep only the green cells
+            cells = ''.join(WALKABLE_CELL if cell == WALKABLE_CELL else ' ' for cell in row)
+
+        runs = []
+        p = 0
+        for match in WALKABLE_RUN.finditer(cells):
+            start, end = match.span()
+            run = len(parent)
+            parent.append(run)
+            num_of_components += 1
+
+            # Merge with every run of the previous row that shares a column with this one
+            while p < len(previous_runs) and previous_runs[p][1] <= start:
+                p += 1
+            q = p
+            while q < len(previous_runs) and previous_runs[q][0] < end:
+                root, other_root = find(run), find(previous_runs[q][2])
+                if root != other_root:
+                    parent[other_root] = root
+                    num_of_components -= 1
+                q += 1
+            p = max(p, q - 1)   # The last run may also touch the next run of this row
+            runs.append((start, end, run))
+
+        if i == 2:  # The green cells are reached from the 2nd row to avoid edge cells
+            start_row_has_green_cell = len(runs) > 0
+        previous_runs = runs
+
+    if not start_row_has_green_cell:
+        return num_of_components == 0
+    return num_of_components == 1
     
+# Maximum number of cells searched for a detour around a new mountain cell
+CONNECTIVITY_SEARCH_LIMIT = 64
+
+# Ring of 8 cells around a cell in circular order, the even positions are the 4 neighbours
+RING_OFFSETS = ((-1, 0), (-1, 1), (0, 1), (1, 1), (1, 0), (1, -1), (0, -1), (-1, -1))
+
+def _ring_keeps_neighbours_connected(mask: int) -> bool:
+    """
+    True if the green neighbours in the ring (bit n set = ring cell n is green) all lie on one
+    unbroken stretch of green ring cells, so they stay connected without the centre cell.
+    """
+    if mask == 0xFF:
+        return True
+    first_gap = next(n for n in range(8) if not mask >> n & 1)
+    stretches_with_neighbour = 0
+    has_neighbour = False
+    for step in range(1, 9):
+        n = (first_gap + step) % 8
+        if mask >> n & 1:
+            has_neighbour = has_neighbour or n % 2 == 0
+        else:
+            stretches_with_neighbour += has_neighbour
+            has_neighbour = False
+    return stretches_with_neighbour <= 1
+
+# Answer of the ring test for every combination of green ring cells
+RING_KEEPS_NEIGHBOURS_CONNECTED = tuple(_ring_keeps_neighbours_connected(mask) for mask in range(256))
+
+# Function to check if a walkable cell can become a mountain without splitting the map
+def can_become_mountain(map: list, i: int, j: int) -> bool:
+    """
+    Check if turning the walkable cell (i, j) into a mountain keeps the green cells around it
+    connected to each other, which keeps the whole map connected.
+    First look at the ring of 8 cells around (i, j): if all the green neighbours lie on one
+    unbroken stretch of green ring cells they stay connected. Otherwise search for a detour
+    between them, giving up (and refusing the cell) after CONNECTIVITY_SEARCH_LIMIT cells.
+    :param map: 2D list representing the game map
+    :param i: Row of the cell
+    :param j: Column of the cell
+    """
+    length, breadth = len(map), len(map[0])
+    def is_green(x, y):
+        return 0 <= x < length and 0 <= y < breadth and map[x][y] == WALKABLE_CELL
+
+    if 0 < i < length - 1 and 0 < j < breadth - 1:
+        above, row, below = map[i-1], map[i], map[i+1]
+        mask = ((above[j] == WALKABLE_CELL) | (above[j+1] == WALKABLE_CELL) << 1 | (row[j+1] == WALKABLE_CELL) << 2
+                | (below[j+1] == WALKABLE_CELL) << 3 | (below[j] == WALKABLE_CELL) << 4 | (below[j-1] == WALKABLE_CELL) << 5
+                | (row[j-1] == WALKABLE_CELL) << 6 | (above[j-1] == WALKABLE_CELL) << 7)
+    else:
+        mask = sum(is_green(i + di, j + dj) << n for n, (di, dj) in enumerate(RING_OFFSETS))
+    if RING_KEEPS_NEIGHBOURS_CONNECTED[mask]:
+        return True
+
+    # Local test failed, look for a short detour linking all the green neighbours
+    neighbours = [(x, y) for x, y in ((i-1, j), (i, j+1), (i+1, j), (i, j-1)) if is_green(x, y)]
+    remaining = set(neighbours[1:])
+    seen = {(i, j), neighbours[0]}
+    queue = deque([neighbours[0]])
+    while queue and len(seen) <= CONNECTIVITY_SEARCH_LIMIT:
+        x, y = queue.popleft()
+        for nx, ny in ((x-1, y), (x+1, y), (x, y-1), (x, y+1)):
+            if (nx, ny) not in seen and is_green(nx, ny):
+                remaining.discard((nx, ny))
+                if not remaining:
+                    return True
+                seen.add((nx, ny))
+                queue.append((nx, ny))
+    return False
+
 # Function to generate mountains on the map
 # (DO NOT CHANGE THIS, YOUR CHANGES WILL BE IGNORED IN THE COMPETITION)
-def generate_mountains(map: list, num_of_cells: int, min_mountain_size: int, max_mountain_size: int, mountain_length_probability: float):
+def generate_mountains(map: list, num_of_cells: int, min_mountain_size: int, max_mountain_size: int, mountain_length_probability: float, rng=random):
     """
     Generate mountains on the map by selecting random cell and creating a cluster of
     mountain cells of random size around it.
+    A cell only becomes a mountain if it keeps the green cells connected, so a connected map
+    stays connected and never needs to be regenerated. If the map runs out of such cells,
+    fewer than num_of_cells mountain cells are generated.
     :param map: 2D list representing the game map
     :param num_of_cells: Number of mountain cells to be generated
     :param min_mountain_size: Minimum size of mountain cluster
     :param max_mountain_size: Maximum size of mountain cluster
     :param mountain_length_probability: Probability of a mountain cell being generated in a continuous row
+    :param rng: random.Random instance of the game (or the random module)
     """
     if num_of_cells < 0:
         raise ValueError("Number of mountain cells should be greater than 0.")
@@ -98,65 +196,85 @@ def generate_mountains(map: list, num_of_cells: int, min_mountain_size: int, max
         raise ValueError("Minimum mountain size should be less than or equal to maximum mountain size.")
     if mountain_length_probability < 0 or mountain_length_probability > 1:
         raise ValueError("Mountain length probability should be between 0 and 1.")
+    if mountain_length_probability == 0:
+        return  # No mountain cell can ever be generated
     
+    # Index of the cells a mountain can start from, so a random start cell is picked in O(1) instead of retrying
+    # random cells. Mountain cells leave it, and so do start cells that would split the map, which bounds the loop.
+    cols = len(map[0])
+    start_cells = CellIndex(len(map) * cols, (i * cols + j for i, row in enumerate(map) for j, cell in enumerate(row) if cell == WALKABLE_CELL))
+
+    def is_valid_index(i, j):
+        return i >= 0 and i < len(map) and j >= 0 and j < len(map[0]) and map[i][j] == WALKABLE_CELL
+
+    def add_mountain_cell(i, j):
+        """Turn (i, j) into a mountain if that keeps the map connected"""
+        if can_become_mountain(map, i, j):
+            map[i][j] = MOUNTAIN_CELL
+            start_cells.remove(i * cols + j)
+            return True
+        return False
+
     mountain_cells = 0
-    while mountain_cells < num_of_cells:
+    while mountain_cells < num_of_cells and len(start_cells) > 0:
         # Select random walkable cell to start mountain from.
-        while True:
-            i = random.randint(0, len(map)-1)
-            j = random.randint(0, len(map[0])-1)
-            if map[i][j] == WALKABLE_CELL:
-                break
+        i, j = divmod(start_cells.choice(rng), cols)
+        if not can_become_mountain(map, i, j):
+            start_cells.remove(i * cols + j)
+            continue
 
-        max_size = min(random.randint(min_mountain_size, max_mountain_size), num_of_cells - mountain_cells)
+        max_size = min(rng.randint(min_mountain_size, max_mountain_size), num_of_cells - mountain_cells)
         current_mountain_size = 0
 
         loopj = j
         direction = 0   # 0: Right, 1: Left, Generate mountain cells in both the directions
-        
-        def is_valid_index(i, j):
-            return i >= 0 and i < len(map) and j >= 0 and j < len(map[0]) and map[i][j] == WALKABLE_CELL
 
         while current_mountain_size < max_size:
             if direction == 0:  # Right
-                if is_valid_index(i, loopj) and map[i][loopj] == WALKABLE_CELL and random.random() < mountain_length_probability:
-                    map[i][loopj] = MOUNTAIN_CELL
+                if is_valid_index(i, loopj) and rng.random() < mountain_length_probability and add_mountain_cell(i, loopj):
                     current_mountain_size += 1
                     loopj += 1
                 else:
                     direction = 1   # Change direction to left
                     loopj = j-1
             else:   # Left
-                if is_valid_index(i, loopj) and map[i][loopj] == WALKABLE_CELL and random.random() < mountain_length_probability:
-                    map[i][loopj] = MOUNTAIN_CELL
+                if is_valid_index(i, loopj) and rng.random() < mountain_length_probability and add_mountain_cell(i, loopj):
                     current_mountain_size += 1
                     loopj -= 1
                 else:
                     i = i+1
                     direction = 0   # Change direction to right
-                    if not is_valid_index(i, j) or map[i][j] != WALKABLE_CELL:  # Check if next row is walkable
+                    if not is_valid_index(i, j):  # Check if next row is walkable
                         break
         
         mountain_cells += current_mountain_size
 
 # Function to generate a valid map
 # (DO NOT CHANGE THIS, YOUR CHANGES WILL BE IGNORED IN THE COMPETITION)
-def generate_map(out_of_bounds_probability: float, mountain_probability: float, mountain_coverage: int):
+def generate_map(out_of_bounds_probability: float, mountain_probability: float, mountain_coverage: int,
+                 rows: int = ROWS, cols: int = COLS, min_mountain_size: int = 10, max_mountain_size: int = 20, rng=random) -> GameMap:
     """
     Generate a valid map with out_of_bounds cells and mountains.
     :param out_of_bounds_probability: Probability of a cell being out_of_bounds
     :param mountain_probability: Probability of a cell being mountain
     :param mountain_coverage: Number of mountain cells to be generated
+    :param rows: Number of rows of the map
+    :param cols: Number of columns of the map
+    :param min_mountain_size: Minimum size of a mountain cluster
+    :param max_mountain_size: Maximum size of a mountain cluster
+    :param rng: random.Random instance of the game (or the random module)
     """
     # Generate a random shaped valid map
-    m = generate_random_shaped_map(ROWS, COLS, out_of_bounds_probability)
+    m = generate_random_shaped_map(rows, cols, out_of_bounds_probability, rng)
     while not check_if_map_is_valid(m):
-        m = generate_random_shaped_map(ROWS, COLS, out_of_bounds_probability)
+        m = generate_random_shaped_map(rows, cols, out_of_bounds_probability, rng)
     
-    # Generate mountains on the map and ensure map remains valid
-    mm = copy.deepcopy(m)
-    generate_mountains(mm, mountain_coverage, 10, 20, mountain_probability)
+    # Generate mountains on the map and ensure map remains valid. Mountains keep the green cells connected, so this
+    # only retries if the 2nd row (where the validity check starts) lost all its green cells.
+    # Copying the rows is enough, cells are immutable strings.
+    mm = [row[:] for row in m]
+    generate_mountains(mm, mountain_coverage, min_mountain_size, max_mountain_size, mountain_probability, rng)
     while not check_if_map_is_valid(mm):
-        mm = copy.deepcopy(m)
-        generate_mountains(mm, mountain_coverage, 10, 20, mountain_probability)
-    return mm
\ No newline at end of file
+        mm = [row[:] for row in m]
+        generate_mountains(mm, mountain_coverage, min_mountain_size, max_mountain_size, mountain_probability, rng)
+    return GameMap.from_rows(mm)
\ No newline at end of file
@@ -0,0 +1,72 @@
+from array import array
+from functools import lru_cache
+from constants import *
+
+# Cell codes that a bot can never move into (same as modules/game_map.py, not imported so that bots can use this module)
+_BLOCKED_CODES = (MOUNTAIN_CODE, OUT_OF_BOUNDS_CODE)
+
+_MOVES = tuple((direction, dx, dy) for direction, (dx, dy) in MOVEMENTS.items() if direction != MOVE_HALT)
+
+# Neighbours of every cell of a board, in compressed sparse row form
+class NeighborTable:
+    """
+    The neighbours of the flat index k are cells[offsets[k]:offsets[k + 1]], reached from k
+    with the moves at the same positions of `moves`. Neighbours are listed in MOVEMENTS order.
+    A search walks these slices instead of adding MOVEMENTS offsets and checking bounds for
+    every cell. Tables are read only, so one table is shared by everything using the same board.
+    """
+    __slots__ = ('rows', 'cols', 'offsets', 'cells', 'moves')
+
+    def __init__(self, rows: int, cols: int, is_passable=None):
+        """
+        :param rows: Number of rows of the board
+        :param cols: Number of columns of the board
+        :param is_passable: Function of a flat index, only the cells it accepts are linked, all cells if None
+        """
+        self.rows = rows
+        self.cols = cols
+        self.offsets = array('i', [0])
+        self.cells = array('i')
+        self.moves = bytearray()
+        for k in range(rows * cols):
+            if is_passable is None or is_passable(k):
+                i, j = divmod(k, cols)
+                for direction, dx, dy in _MOVES:
+                    ni, nj = i + dx, j + dy
+                    if 0 <= ni < rows and 0 <= nj < cols and (is_passable is None or is_passable(ni * cols + nj)):
+                        self.cells.append(ni * cols + nj)
+                        self.moves.append(direction)
+            self.offsets.append(len(self.cells))
+
+    def neighbors(self, k: int) -> array:
+        """
+        Flat indices of the neighbours of the flat index k
+        """
+        return self.cells[self.offsets[k]:self.offsets[k + 1]]
+
+    def moves_from(self, k: int) -> bytes:
+        """
+        Moves leading from the flat index k to each of its neighbours
+        """
+        return self.moves[self.offsets[k]:self.offsets[k + 1]]
+
+# Neighbours of every cell of an empty board, for bots that do not know the terrain
+@lru_cache(maxsize=8)
+def grid_neighbors(rows: int, cols: int) -> NeighborTable:
+    """
+    Table of the in bounds neighbours of every cell, shared by all the callers with the same board size
+    :param rows: Number of rows of the board
+    :param cols: Number of columns of the board
+    """
+    return NeighborTable(rows, cols)
+
+# Neighbours a bot can move between on a game map
+def passable_neighbors(map) -> NeighborTable:
+    """
+    Table linking the cells that are not mountains or out of bounds. Those never change during
+    a game, so the engine builds it once per map (a GameMap, or anything with rows, cols and
+    terrain). Blocked cells have no neighbours.
+    :param map: The game map
+    """
+    terrain = map.terrain
+    return NeighborTable(map.rows, map.cols, lambda k: terrain[k] not in _BLOCKED_CODES)
@@ -0,0 +1,186 @@
+import pygame
+from constants import *
+from modules.display import *
+from modules.game_map import GameMap
+
+# Height of the title area above the board
+BOARD_TOP = 100
+
+# Static terrain drawn under the food and the bots
+_STATIC_TERRAIN_TABLE = bytes(WALKABLE_CODE if c == FOOD_CODE else c for c in range(256))
+
+_fonts = {}
+
+# Cached pygame font
+def get_font(name, size: int, bold: bool = False) -> pygame.font.Font:
+    """
+    pygame.font.SysFont(name, size, bold), created once per process
+    """
+    key = (name, size, bold)
+    if key not in _fonts:
+        _fonts[key] = pygame.font.SysFont(name, size, bold=bold)
+    return _fonts[key]
+
+# Draws the game screen of main.py
+class Renderer:
+    """
+    Draws the game screen: the title, the speed and frame buttons, the board with a numbered
+    tile for every bot, and a side panel with the moves left and the scoreboard. Only what
+    changed since the last frame is repainted.
+
+    The title, the speed buttons and the static terrain of the board are drawn once to a
+    background surface. Every cell state (terrain code, or a bot with its number) is a
+    pre-rendered tile, so a cell is redrawn with one blit. The map tracks the cells written
+    during a tick (GameMap.track_changes()), and only those cells and the side panel are
+    redrawn. draw() returns the rectangles to push with pygame.display.update().
+    """
+
+    def __init__(self, screen: pygame.Surface, speed_buttons: list, bot_names: dict, frame_buttons: list = ()):
+        """
+        :param screen: UI screen
+        :param speed_buttons: List of speed buttons to alter game speed
+        :param bot_names: Dictionary containing the names of the bots
+        :param frame_buttons: List of buttons to choose the ticks played per frame, none if empty
+        """
+        self.screen = screen
+        self.speed_buttons = speed_buttons
+        self.frame_buttons = frame_buttons
+        self.bot_names = bot_names
+        self._map = None
+        self._static_terrain = None
+        self._background = None
+        self._cell_size = None
+        self._tiles = {}        # { cell code -> tile }
+        self._bot_tiles = {}    # { bot id -> tile }
+        self._panel = None
+        self._texts = {}
+
+    def invalidate(self):
+        """
+        Repaint the whole screen on the next draw(), after something else was drawn on it
+        """
+        self._map = None
+
+    def _tile(self, color: tuple) -> pygame.Surface:
+        size = self._cell_size
+        tile = pygame.Surface((size, size))
+        tile.fill(color)
+        pygame.draw.rect(tile, BORDER_COLOR, (0, 0, size, size), 1)
+        return tile
+
+    def _bot_tile(self, bot_id: int) -> pygame.Surface:
+        tile = self._bot_tiles.get(bot_id)
+        if tile is None:
+            tile = self._tile(COLOR_MAP.get(PLAYER_CELL, (255, 255, 255)))
+            text = get_font(None, 18).render(str(bot_id), True, (0, 0, 0))
+            tile.blit(text, (self._cell_size // 3, self._cell_size // 4))
+            self._bot_tiles[bot_id] = tile
+        return tile
+
+    def _text(self, font: pygame.font.Font, text: str) -> pygame.Surface:
+        key = (font, text)
+        surface = self._texts.get(key)
+        if surface is None:
+            if len(self._texts) > 1024:
+                self._texts.clear()
+            surface = self._texts[key] = font.render(text, True, TEXT_COLOR)
+        return surface
+
+    def _build_background(self, map: GameMap):
+        screen = self.screen
+        cell_size = get_cell_size(map.rows, map.cols)
+        if cell_size != self._cell_size:
+            self._cell_size = cell_size
+            self._tiles = {code: self._tile(COLOR_MAP[cell]) for code, cell in enumerate(CODE_CELLS)}
+            self._bot_tiles = {}
+        background = pygame.Surface(screen.get_size())
+        background.fill(BACKGROUND_COLOR)
+
+        text = get_font('Arial', 45, True).render("PACMAN WARS", True, TEXT_COLOR)
+        background.blit(text, (WIDTH // 2 - text.get_width() // 2, 20))
+        font = get_font('Arial', 15)
+        background.blit(font.render("Change game speed", True, TEXT_COLOR), (WIDTH + 10, HEIGHT - 80))
+        for button in self.speed_buttons:
+            button.draw(background, font)
+        if self.frame_buttons:
+            background.blit(font.render("Ticks per frame", True, TEXT_COLOR), (WIDTH + 10, HEIGHT - 10))
+            for button in self.frame_buttons:
+                button.draw(background, font)
+
+        tiles, cols = self._tiles, map.cols
+        background.blits([(tiles[code], ((k % cols) * cell_size, (k // cols) * cell_size + BOARD_TOP))
+                          for k, code in enumerate(self._static_terrain)], False)
+        self._background = background
+
+    def _cell_rect(self, k: int, cols: int) -> pygame.Rect:
+        size = self._cell_size
+        return pygame.Rect((k % cols) * size, (k // cols) * size + BOARD_TOP, size, size)
+
+    def _draw_cell(self, map: GameMap, k: int) -> pygame.Rect:
+        rect = self._cell_rect(k, map.cols)
+        bot_id = map.occupancy[k]
+        if bot_id:
+            self.screen.blit(self._bot_tile(bot_id), rect)
+        elif map.terrain[k] == FOOD_CODE:
+            self.screen.blit(self._tiles[FOOD_CODE], rect)
+        else:
+            self.screen.blit(self._background, rect, rect)
+        return rect
+
+    def _draw_panel(self, moves_left: int, bot_food: dict) -> pygame.Rect:
+        screen = self.screen
+        rect = pygame.Rect(WIDTH, 0, screen.get_width() - WIDTH, screen.get_height())
+        self.restore(rect)
+        screen.blit(self._text(get_font('Arial', 25, True), f"Moves left : {moves_left}"), (WIDTH + 20, 20))
+
+        font = get_font('Arial', 20)
+        sorted_bots = sorted(bot_food.items(), key=lambda item: item[1], reverse=True)
+        x_offset = WIDTH + 20
+        y_offset = 120
+        pygame.draw.rect(screen, BORDER_COLOR, (x_offset - 10, y_offset - 10, 180, 40 + len(sorted_bots) * 30), 2)
+        screen.blit(self._text(font, "Scoreboard"), (x_offset, y_offset))
+        y_offset += 30
+        for bot_id, food in sorted_bots:
+            bot_name = self.bot_names.get(bot_id, f"Bot {bot_id}")
+            screen.blit(self._text(font, f"{bot_id}. {bot_name}: {food}"), (x_offset, y_offset))
+            y_offset += 30
+        return rect
+
+    def restore(self, rect: pygame.Rect) -> pygame.Rect:
+        """
+        Paint the background back over a part of the screen, to draw something new on it
+        """
+        self.screen.blit(self._background, rect, rect)
+        return rect
+
+    def draw(self, map: GameMap, moves_left: int, bot_food: dict) -> list:
+        """
+        Draw the game screen, returns the rectangles of the screen that changed
+        :param map: The game map
+        :param moves_left: number of moves left to play in the game
+        :param bot_food: Dictionary containing the food count of the bots
+        """
+        rects = []
+        if map is not self._map:
+            # New map object (new game, or a replay seek): repaint everything
+            map.track_changes()
+            map.take_changes()
+            static_terrain = bytes(map.terrain).translate(_STATIC_TERRAIN_TABLE)
+            if static_terrain != self._static_terrain or get_cell_size(map.rows, map.cols) != self._cell_size:
+                self._static_terrain = static_terrain
+                self._build_background(map)
+            self.screen.blit(self._background, (0, 0))
+            for k in range(map.rows * map.cols):
+                if map.occupancy[k] or map.terrain[k] == FOOD_CODE:
+                    self._draw_cell(map, k)
+            self._map = map
+            self._panel = None
+            rects.append(self.screen.get_rect())
+        else:
+            rects.extend(self._draw_cell(map, k) for k in map.take_changes())
+
+        panel = (moves_left, tuple(bot_food.items()))
+        if panel != self._panel:
+            self._panel = panel
+            rects.append(self._draw_panel(moves_left, bot_food))
+        return rects
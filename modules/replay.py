@@ -0,0 +1,250 @@
+import struct
+import zlib
+from typing import Iterator, Optional
+from constants import *
+from modules.game_map import GameMap
+from modules.game_state import GameState
+from modules.bot_operations import move_bots
+
+# Replay file, all little endian:
+#   header: magic, format version (uint16), rows, cols (uint32), number of bots (uint16), number of ticks (uint32),
+#           game seed (int64, -1 if unknown), length of the bot names (uint32)
+#   bot names, utf-8, one per line in bot id order
+#   zlib compressed body:
+#     terrain of the map at the start of the game, rows * cols cell codes (uint8)
+#     spawn cell (flat index) and starting food of every bot, varints
+#     every tick: the directions of the bots alive at the start of the tick in bot id order, two per byte
+#     (low nibble first), then the number of food spawns and the food cells as zigzag varint deltas from
+#     the previous food cell of the tick (the first one from 0), in spawn order
+# Bot moves are replayed with move_bots(), so a tick costs a few bytes and no bot code is needed to replay it.
+REPLAY_MAGIC = b'PMWRPLY\x00'
+REPLAY_VERSION = 1
+REPLAY_HEADER = struct.Struct('<8sHIIHIqI')
+
+# Ticks between two keyframes of a ReplayPlayer
+KEYFRAME_INTERVAL = 100
+
+def _write_varint(out: bytearray, value: int):
+    while value > 0x7f:
+        out.append(value & 0x7f | 0x80)
+        value >>= 7
+    out.append(value)
+
+def _read_varint(data: bytes, offset: int) -> tuple:
+    value = shift = 0
+    while True:
+        byte = data[offset]
+        offset += 1
+        value |= (byte & 0x7f) << shift
+        if byte < 0x80:
+            return value, offset
+        shift += 7
+
+# Records a game as it is played
+class ReplayRecorder:
+    """
+    Create it once the bots are spawned, then call record_tick() after every tick with the
+    directions the bots played and the food cells generate_food() returned.
+    """
+
+    def __init__(self, map: GameMap, bot_positions: dict, bot_food: dict, bot_names: dict, seed: int = None):
+        """
+        :param map: The game map with the bots spawned on it
+        :param bot_positions: Dictionary containing the starting positions of the bots
+        :param bot_food: Dictionary containing the starting food of the bots
+        :param bot_names: Dictionary containing { bot_id -> bot name } mapping
+        :param seed: Seed of the game, if known
+        """
+        if list(bot_positions) != list(range(1, len(bot_positions) + 1)):
+            raise ValueError("Bot ids should be 1, 2, ... in order.")
+        self.rows, self.cols = map.rows, map.cols
+        self.seed = seed
+        self.bot_names = [bot_names[id] for id in bot_positions]
+        self.num_ticks = 0
+        self._body = bytearray(map.terrain)
+        for id, (x, y) in bot_positions.items():
+            _write_varint(self._body, x * map.cols + y)
+            _write_varint(self._body, bot_food[id])
+
+    def record_tick(self, bot_directions: dict, food_cells: list = ()):
+        """
+        Record a tick
+        :param bot_directions: Directions played by the bots alive at the start of the tick
+        :param food_cells: Cells that got food after the bots moved, as returned by generate_food()
+        """
+        body = self._body
+        directions = [int(bot_directions[id]) for id in sorted(bot_directions)]
+        for i in range(0, len(directions) - 1, 2):
+            body.append(directions[i] | directions[i + 1] << 4)
+        if len(directions) % 2:
+            body.append(directions[-1])
+        _write_varint(body, len(food_cells))
+        previous = 0
+        for k in food_cells:
+            delta = k - previous
+            _write_varint(body, delta << 1 if delta >= 0 else (-delta << 1) - 1)
+            previous = k
+        self.num_ticks += 1
+
+    def to_bytes(self) -> bytes:
+        names = '\n'.join(self.bot_names).encode()
+        header = REPLAY_HEADER.pack(REPLAY_MAGIC, REPLAY_VERSION, self.rows, self.cols, len(self.bot_names),
+                                    self.num_ticks, -1 if self.seed is None else self.seed, len(names))
+        return header + names + zlib.compress(bytes(self._body), 9)
+
+    def save(self, path: str):
+        with open(path, 'wb') as f:
+            f.write(self.to_bytes())
+
+# Recorded game
+class Replay:
+    """
+    A recorded game that can be played back tick by tick without running any bot code
+    """
+
+    def __init__(self, data: bytes):
+        """
+        :param data: Replay file contents, as written by ReplayRecorder
+        """
+        magic, version, self.rows, self.cols, num_bots, self.num_ticks, seed, names_length = REPLAY_HEADER.unpack_from(data)
+        if magic != REPLAY_MAGIC or version != REPLAY_VERSION:
+            raise ValueError(f"Not a version {REPLAY_VERSION} replay.")
+        self.seed = None if seed < 0 else seed
+        offset = REPLAY_HEADER.size
+        names = data[offset:offset + names_length].decode().split('\n')
+        self.bot_names = {id: name for id, name in enumerate(names, start=1)} if num_bots else {}
+        self._body = zlib.decompress(data[offset + names_length:])
+
+        size = self.rows * self.cols
+        offset = size
+        self._spawns = {}
+        self._start_food = {}
+        for id in range(1, num_bots + 1):
+            self._spawns[id], offset = _read_varint(self._body, offset)
+            self._start_food[id], offset = _read_varint(self._body, offset)
+        self._ticks_offset = offset
+
+    @classmethod
+    def load(cls, path: str) -> 'Replay':
+        with open(path, 'rb') as f:
+            return cls(f.read())
+
+    def initial_state(self) -> tuple:
+        """
+        (map, bot_positions, bot_ids, bot_food) at the start of the game
+        """
+        game_map = GameMap(self.rows, self.cols, bytearray(self._body[:self.rows * self.cols]))
+        bot_positions = {}
+        for id, k in self._spawns.items():
+            game_map.occupy(k, id)
+            bot_positions[id] = list(divmod(k, self.cols))
+        bot_ids = {id: BOT_ALIVE for id in self._spawns}
+        return game_map, bot_positions, bot_ids, dict(self._start_food)
+
+    def _apply_tick(self, offset: int, map: GameMap, bot_positions: dict, bot_ids: dict, bot_food: dict) -> tuple:
+        """
+        Play the tick stored at offset on the given state, returns (offset of the next tick, directions, food cells)
+        """
+        body = self._body
+        alive = [id for id, status in bot_ids.items() if status == BOT_ALIVE]
+        bot_directions = {}
+        for i, id in enumerate(alive):
+            byte = body[offset + i // 2]
+            bot_directions[id] = byte >> 4 if i % 2 else byte & 0x0f
+        offset += (len(alive) + 1) // 2
+        move_bots(map, bot_ids, bot_positions, bot_directions, bot_food)
+
+        num_food, offset = _read_varint(body, offset)
+        food_cells = []
+        k = 0
+        for _ in range(num_food):
+            value, offset = _read_varint(body, offset)
+            k += value >> 1 if not value & 1 else -((value + 1) >> 1)
+            map.add_food(k)
+            food_cells.append(k)
+        return offset, bot_directions, food_cells
+
+    def play(self) -> Iterator[tuple]:
+        """
+        Play the game back, yields (tick, map, bot_positions, bot_ids, bot_food, bot_directions, food_cells)
+        after every tick. The same state objects are updated in place from tick to tick.
+        """
+        state = self.initial_state()
+        offset = self._ticks_offset
+        for tick in range(1, self.num_ticks + 1):
+            offset, bot_directions, food_cells = self._apply_tick(offset, *state)
+            yield (tick, *state, bot_directions, food_cells)
+
+    def state_at(self, tick: int) -> tuple:
+        """
+        (map, bot_positions, bot_ids, bot_food) after the given tick, 0 for the start of the game.
+        Plays the game from its start, use a ReplayPlayer to seek repeatedly.
+        """
+        if not 0 <= tick <= self.num_ticks:
+            raise IndexError("replay tick out of range")
+        state = self.initial_state()
+        offset = self._ticks_offset
+        for _ in range(tick):
+            offset, _, _ = self._apply_tick(offset, *state)
+        return state
+
+# Random access playback of a replay
+class ReplayPlayer:
+    """
+    Plays a Replay forwards and seeks to any of its ticks. A GameState keyframe and the offset of
+    the next tick in the replay are kept every keyframe_interval ticks, so a seek restores the
+    closest keyframe before the tick and plays at most keyframe_interval - 1 ticks from there.
+    Keyframes are captured the first time playback goes past them.
+    """
+
+    def __init__(self, replay: Replay, keyframe_interval: int = KEYFRAME_INTERVAL):
+        """
+        :param replay: The replay to play
+        :param keyframe_interval: Ticks between two keyframes
+        """
+        if keyframe_interval < 1:
+            raise ValueError("Keyframe interval should be greater than 0.")
+        self.replay = replay
+        self.keyframe_interval = keyframe_interval
+        self.tick = 0
+        self.bot_directions = {}    # Directions played on the current tick
+        self.food_cells = []        # Food spawned on the current tick
+        self._state = replay.initial_state()
+        self._offset = replay._ticks_offset
+        self._keyframes = [(GameState(*self._state), self._offset)]    # Keyframe i is the state after tick i * interval
+
+    @property
+    def state(self) -> tuple:
+        """
+        (map, bot_positions, bot_ids, bot_food) after the current tick, updated in place by step()
+        """
+        return self._state
+
+    def step(self) -> bool:
+        """
+        Play the next tick, returns False at the end of the replay
+        """
+        if self.tick >= self.replay.num_ticks:
+            return False
+        self._offset, self.bot_directions, self.food_cells = self.replay._apply_tick(self._offset, *self._state)
+        self.tick += 1
+        if self.tick == len(self._keyframes) * self.keyframe_interval:
+            self._keyframes.append((GameState(*self._state), self._offset))
+        return True
+
+    def seek(self, tick: int) -> tuple:
+        """
+        Move to the given tick (clamped to the replay), returns the state after it
+        :param tick: Tick to move to, 0 for the start of the game
+        """
+        tick = max(0, min(tick, self.replay.num_ticks))
+        keyframe = min(tick // self.keyframe_interval, len(self._keyframes) - 1)
+        if not keyframe * self.keyframe_interval <= self.tick <= tick:
+            snapshot, self._offset = self._keyframes[keyframe]
+            game = snapshot.restore()
+            self._state = (game.map, game.bot_positions, game.bot_ids, game.bot_food)
+            self.tick = keyframe * self.keyframe_interval
+            self.bot_directions, self.food_cells = {}, []
+        while self.tick < tick:
+            self.step()
+        return self._state
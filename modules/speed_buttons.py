@@ -1,5 +1,6 @@
 import pygame
 from constants import *
+from modules.display import *
 
 # Pygame button creator
 class Button:
@@ -45,3 +46,20 @@ def get_speed_buttons():
     button5 = Button(WIDTH + 140, HEIGHT - 40, 20, 20, WALKABLE_CELL_COLOR, "x16", lambda : 16)
     buttons = [button1, button2, button3, button4, button5]
     return buttons
+
+# Ticks per frame of the turbo mode: game logic runs unthrottled and the screen is drawn TURBO_FPS times a second
+TURBO = 0
+TURBO_FPS = 60
+
+# Generate buttons to skip frames
+def get_frame_buttons():
+    """
+    Generates 5 buttons that draw every 1st, 5th, 10th and 50th tick, and the turbo mode
+    """
+    button1 = Button(WIDTH + 20, HEIGHT + 12, 20, 20, WALKABLE_CELL_COLOR, "1", lambda : 1)
+    button2 = Button(WIDTH + 50, HEIGHT + 12, 20, 20, WALKABLE_CELL_COLOR, "5", lambda : 5)
+    button3 = Button(WIDTH + 80, HEIGHT + 12, 20, 20, WALKABLE_CELL_COLOR, "10", lambda : 10)
+    button4 = Button(WIDTH + 110, HEIGHT + 12, 20, 20, WALKABLE_CELL_COLOR, "50", lambda : 50)
+    button5 = Button(WIDTH + 140, HEIGHT + 12, 20, 20, WALKABLE_CELL_COLOR, "MAX", lambda : TURBO)
+    buttons = [button1, button2, button3, button4, button5]
+    return buttons
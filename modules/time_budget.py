@@ -0,0 +1,94 @@
+import signal
+import threading
+import time
+from collections import defaultdict
+from typing import Optional
+from constants import *
+
+# Raised inside a bot's move() when its CPU budget runs out. Derived from BaseException so that a
+# bot's own `except Exception` cannot swallow it.
+class MoveTimeout(BaseException):
+    pass
+
+def _raise_move_timeout(signum, frame):
+    raise MoveTimeout()
+
+# CPU time limits of the bots of a game
+class BotTimeBudget:
+    """
+    Calls bot.move() under a per-move and a per-game CPU time limit. A move that runs over
+    its limit gets MOVE_HALT and counts an overrun. A bot that used up its game budget (which
+    its last move overran, unless it took exactly the rest) goes to `exhausted`, and its later
+    moves are MOVE_HALT without calling it or counting more overruns.
+
+    In the main thread of a Unix process, move() is interrupted when the limit is reached with
+    a virtual CPU timer (signal.setitimer), which costs two system calls per move. Elsewhere the
+    move runs to completion and is only discarded if it took too long, so a looping bot can only
+    be stopped by running it in another process (see modules/bot_sandbox.py).
+    """
+
+    def __init__(self, move_limit: Optional[float] = None, game_limit: Optional[float] = None):
+        """
+        :param move_limit: CPU seconds a bot may spend on one move, None for no limit
+        :param game_limit: CPU seconds a bot may spend on all its moves of a game, None for no limit
+        """
+        if (move_limit is not None and move_limit <= 0) or (game_limit is not None and game_limit <= 0):
+            raise ValueError("Time limits should be greater than 0.")
+        self.move_limit = move_limit
+        self.game_limit = game_limit
+        self.used = defaultdict(float)      # { bot_id -> CPU seconds used }
+        self.overruns = defaultdict(int)    # { bot_id -> moves replaced by MOVE_HALT for running out of time }
+        self.exhausted = set()              # Bots that used up their game budget
+        self._timer_installed = False
+
+    def _can_interrupt(self) -> bool:
+        if not hasattr(signal, 'setitimer') or threading.current_thread() is not threading.main_thread():
+            return False
+        if not self._timer_installed:
+            signal.signal(signal.SIGVTALRM, _raise_move_timeout)
+            self._timer_installed = True
+        return True
+
+    def move(self, bot_id: int, bot_move, **kwargs) -> int:
+        """
+        Call bot_move(**kwargs) for the bot within its budget
+        :param bot_id: ID of the bot
+        :param bot_move: The bot's move method
+        :return: direction returned by the bot, MOVE_HALT if it failed or ran out of time
+        """
+        limit = self.move_limit
+        if self.game_limit is not None:
+            if bot_id in self.exhausted:
+                return MOVE_HALT
+            remaining = self.game_limit - self.used[bot_id]
+            limit = remaining if limit is None else min(limit, remaining)
+        if limit is None:
+            try:
+                return bot_move(**kwargs)
+            except Exception:
+                return MOVE_HALT
+
+        interrupt = self._can_interrupt()
+        timed_out = False
+        start = time.thread_time()
+        try:
+            try:
+                if interrupt:
+                    signal.setitimer(signal.ITIMER_VIRTUAL, limit)
+                direction = bot_move(**kwargs)
+            finally:
+                if interrupt:
+                    signal.setitimer(signal.ITIMER_VIRTUAL, 0)
+        except MoveTimeout:
+            direction = MOVE_HALT
+            timed_out = True
+        except Exception:
+            direction = MOVE_HALT
+        elapsed = time.thread_time() - start
+        self.used[bot_id] += elapsed
+        if self.game_limit is not None and self.used[bot_id] >= self.game_limit:
+            self.exhausted.add(bot_id)
+        if timed_out or elapsed > limit:
+            self.overruns[bot_id] += 1
+            direction = MOVE_HALT
+        return direction
@@ -0,0 +1,154 @@
+from itertools import chain
+try:
+    import numpy as np
+except ImportError:     # NumPy is optional, games fall back to move_bots()
+    np = None
+
+from constants import *
+from modules.game_map import GameMap, BLOCKED_CODES
+from modules.neighbors import NeighborTable
+
+# Positions are packed into one integer key (x * _KEY_SHIFT + y) to look them up with array operations
+_KEY_SHIFT = 1 << 32
+
+# Row and column offsets of every direction, indexed by direction
+_MOVE_X = [MOVEMENTS[direction][0] for direction in range(len(MOVEMENTS))]
+_MOVE_Y = [MOVEMENTS[direction][1] for direction in range(len(MOVEMENTS))]
+
+# Resolve the fights of a tick with array operations
+def resolve_fights(current_keys, final_keys, food, alive):
+    """
+    Apply the rules of bot_fights() to the bots alive at the start of the tick, given in bot_ids order.
+    The result is exactly the one of bot_fights(), including its quirks: when the first bot of a
+    crossing pair loses, the second bot fights it again on its turn and takes its food twice, and a
+    cell fight starts from the first bot heading to the cell even if it died crossing.
+    :param current_keys: Position key of every bot before the move
+    :param final_keys: Position key of every bot after the move
+    :param food: Food of every bot (int64), updated in place
+    :param alive: Alive flag of every bot, updated in place
+    """
+    n = len(current_keys)
+    if n == 0:
+        return
+    bots = np.arange(n)
+
+    # Crossing bots: the bot standing on my final cell moves to my current cell
+    order = np.argsort(current_keys)
+    slot = np.minimum(np.searchsorted(current_keys[order], final_keys), n - 1)
+    partner = order[slot]
+    crossing = (current_keys[partner] == final_keys) & (partner != bots) & (final_keys[partner] == current_keys)
+    first = bots[crossing & (bots < partner)]
+    second = partner[first]
+    first_food, second_food = food[first], food[second]
+    first_wins = first_food > second_food
+    second_food_after = second_food + first_food
+    second_wins_again = second_food_after > first_food
+    food[first] = np.where(first_wins, first_food + second_food,
+                           np.where(second_wins_again, first_food, first_food + second_food_after))
+    food[second] = np.where(first_wins, second_food,
+                            np.where(second_wins_again, second_food_after + first_food, second_food_after))
+    alive[second[first_wins]] = False
+    alive[first[~first_wins]] = False
+    alive[second[~first_wins & ~second_wins_again]] = False
+
+    # Bots reaching the same cell, grouped by final cell in bot_ids order
+    order = np.lexsort((bots, final_keys))
+    keys = final_keys[order]
+    group_start = np.ones(n, dtype=bool)
+    group_start[1:] = keys[1:] != keys[:-1]
+    starts = np.flatnonzero(group_start)
+    group = np.cumsum(group_start) - 1
+    member_alive = alive[order]
+    member_food = food[order]
+    # The strongest bot is the first one with the most food among the alive bots and the first bot of the group
+    candidate = member_alive | group_start
+    scores = np.where(candidate, member_food, np.iinfo(np.int64).min)
+    best = np.maximum.reduceat(scores, starts)
+    ranks = np.where(candidate & (scores == best[group]), bots, n)
+    strongest = order[np.minimum.reduceat(ranks, starts)]
+    victim = member_alive & (order != strongest[group])
+    food[strongest] += np.add.reduceat(np.where(victim, member_food, 0), starts)
+    alive[order[victim]] = False
+
+# Moves allowed by a passable neighbour table
+def _has_move(neighbors: NeighborTable, cells, directions):
+    """
+    True for every bot whose direction is one of the moves listed for its cell (never MOVE_HALT)
+    :param neighbors: Passable neighbour table of the map
+    :param cells: Flat index of the cell of every bot
+    :param directions: Direction of every bot
+    """
+    offsets = np.frombuffer(neighbors.offsets, dtype=np.int32)
+    moves = np.frombuffer(neighbors.moves, dtype=np.uint8)
+    if len(moves) == 0:     # No two passable cells touch
+        return np.zeros(len(cells), dtype=bool)
+    start, end = offsets[cells], offsets[cells + 1]
+    # A cell lists at most 4 moves, look at the 4 slots from its start and keep those inside its slice
+    slots = start[:, None] + np.arange(4)
+    listed = (slots < end[:, None]) & (moves[np.minimum(slots, len(moves) - 1)] == directions[:, None])
+    return listed.any(axis=1)
+
+# NumPy version of move_bots()
+def move_bots_vectorized(map: GameMap, bot_ids: dict, bot_current_positions: dict, bot_directions: dict, bot_food: dict,
+                         neighbors: NeighborTable = None):
+    """
+    Drop-in replacement of move_bots() for games with many bots. Final positions, wall clamping and
+    fights are computed on arrays, only the bots that move or die touch the map, in the same order as
+    move_bots() so the free cell index (and so the food spawns) stay the same.
+    :param map: The game map
+    :param bot_ids: Dictionary containing the IDs of the bots
+    :param bot_current_positions: Dictionary containing the current positions of the bots
+    :param bot_directions: Dictionary containing the directions in which the bots are moving
+    :param bot_food: Dictionary containing the food count of the bots
+    :param neighbors: passable_neighbors(map), built once per game. A move is allowed when it is one of
+                      the moves listed for the bot's cell, instead of checking the terrain it leads to.
+    """
+    if np is None:
+        raise ImportError("NumPy is needed for move_bots_vectorized(), use move_bots() instead.")
+
+    ids = [id for id, status in bot_ids.items() if status == BOT_ALIVE]
+    if not ids:
+        return
+    n = len(ids)
+    directions = [bot_directions[id] for id in ids]
+    if not MOVEMENTS.keys() >= set(directions):
+        raise KeyError(next(direction for direction in directions if direction not in MOVEMENTS))
+    directions = np.fromiter(directions, dtype=np.int64, count=n)
+    move_x, move_y = np.array(_MOVE_X)[directions], np.array(_MOVE_Y)[directions]
+    positions = np.fromiter(chain.from_iterable([bot_current_positions[id] for id in ids]), dtype=np.int64, count=2 * n)
+    current_x, current_y = positions[0::2], positions[1::2]
+    final_x, final_y = current_x + move_x, current_y + move_y
+    if neighbors is not None:
+        blocked = ~_has_move(neighbors, current_x * map.cols + current_y, directions)
+    else:
+        terrain = np.frombuffer(map.terrain, dtype=np.uint8)
+        blocked = np.isin(terrain[final_x * map.cols + final_y], BLOCKED_CODES)     # move not allowed
+    final_x = np.where(blocked, current_x, final_x)
+    final_y = np.where(blocked, current_y, final_y)
+
+    start_food = np.fromiter([bot_food[id] for id in ids], dtype=np.int64, count=n)
+    food = start_food.copy()
+    alive = np.ones(n, dtype=bool)
+    resolve_fights(current_x * _KEY_SHIFT + current_y, final_x * _KEY_SHIFT + final_y, food, alive)
+
+    # Only the bots that moved, died or fought need their dictionaries updated
+    moved = ~blocked & ((move_x != 0) | (move_y != 0))
+    changed = moved | ~alive
+    food_list = food.tolist()
+    for i in np.flatnonzero(food != start_food).tolist():
+        bot_food[ids[i]] = food_list[i]
+    for i in np.flatnonzero(~alive).tolist():
+        bot_ids[ids[i]] = BOT_DEAD
+
+    # A bot that stays alive on its cell leaves the map unchanged, every other bot is moved like move_bots() does
+    cols = map.cols
+    is_alive = alive.tolist()
+    current_x, current_y = current_x.tolist(), current_y.tolist()
+    final_x, final_y = final_x.tolist(), final_y.tolist()
+    for i in np.flatnonzero(changed).tolist():
+        id = ids[i]
+        map.vacate(current_x[i] * cols + current_y[i], id)
+        if is_alive[i]:
+            bot_current_positions[id] = [final_x[i], final_y[i]]
+            if map.occupy(final_x[i] * cols + final_y[i], id):
+                bot_food[id] += 1
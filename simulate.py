@@ -4,7 +4,10 @@ import sys
 import os
 import time
 import random
+import argparse
 from collections import defaultdict
+from functools import partial
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 
 # --- Add project root to Python path if necessary ---
 project_root = os.path.dirname(os.path.abspath(__file__))
@@ -17,11 +20,15 @@ try:
     from constants import *
     from modules.map_generator import generate_map
     from modules.food_generator import generate_food
-    from modules.bot_operations import get_number_of_bots, generate_bot_positions, load_bots, calculate_bot_directions, move_bots
-    # Import your bot classes (add others if you have more)
-    from bots.debtanu_bot import DebtanuBot # Assuming you renamed it
-    # from bots.basic_bot1 import BasicBot1
-    # from bots.basic_bot2 import BasicBot2
+    from modules.bot_operations import get_bot_classes, generate_bot_positions, load_bots, calculate_bot_directions, move_bots
+    from modules.bot_operations import calculate_bot_directions_threaded, is_free_threaded
+    from modules.game_config import GameConfig
+    from modules.map_bank import MAP_BANK_SIZE, load_map_bank, open_map_bank
+    from modules.vector_resolver import move_bots_vectorized
+    from modules.neighbors import passable_neighbors
+    from modules.time_budget import BotTimeBudget
+    from modules.bot_sandbox import BotSandbox
+    from modules.replay import ReplayRecorder
 
 except ImportError as e:
     print(f"Error importing game modules: {e}")
@@ -30,44 +37,92 @@ except ImportError as e:
 
 # --- Simulation Parameters ---
 NUM_SIMULATIONS = 300
-MAX_GAME_MOVES = 1000
-MAP_GENERATION_PARAMS = (0.6, 0.6, 200)
-
-# --- Food Generation Config (Match main.py's chosen logic) ---
-MAX_FOOD_PERCENTAGE = 0.15
-FOOD_GENERATION_QUANTITY_PER_BOT = 1
+# Board, bot and food settings come from GameConfig (Match main.py's chosen logic)
 # ---
 
-def run_single_simulation():
-    """Runs one full game simulation without graphics and returns the result including final bot statuses."""
+def run_single_simulation(seed=None, config: GameConfig = None, map_bank_path: str = None, replay_dir: str = None):
+    """
+    Runs one full game simulation without graphics and returns the result including final bot statuses.
+    All the randomness of the game (map, spawns, food and bots) comes from the seed, so a game is
+    replayed exactly by running it again with the same seed, settings and map bank.
+    :param seed: Seed for the game's randomness, a random seed if None
+    :param config: Game settings, the standard game if not given
+    :param map_bank_path: Map bank file to take the map from (map seed % bank size), a new map is generated if None
+    :param replay_dir: Directory to save the replay of the game in (game_<seed>.pmwr), no replay if None
+    """
+    sandbox = None
+    thread_pool = None
     try:
+        if seed is None:
+            seed = random.randrange(2**32)
+        rng = random.Random(seed)   # Random generator of this game
+        random.seed(seed)   # Bots that still use the random module are reproducible too
+        if config is None:
+            config = GameConfig()
+
         # --- Initialize Game State ---
-        game_map = generate_map(*MAP_GENERATION_PARAMS)
-        number_of_bots = get_number_of_bots()
+        map_index = None
+        if map_bank_path is not None:
+            map_bank = open_map_bank(map_bank_path)
+            map_index = seed % len(map_bank)
+            game_map = map_bank[map_index]
+        else:
+            game_map = generate_map(**config.map_params(), rng=rng)
+        bot_classes = get_bot_classes()     # Same order as main.py, so a seed plays the same game there
+        number_of_bots = len(bot_classes)
         if number_of_bots == 0: return None
-        bot_positions = generate_bot_positions(game_map, number_of_bots)
-        bots, bot_names = load_bots(bot_positions, game_map)
+        if config.number_of_bots is not None:
+            number_of_bots = config.number_of_bots
+        bot_positions = generate_bot_positions(game_map, number_of_bots, rng)
+        threaded = config.decision_workers > 0 and not config.sandbox_bots and is_free_threaded()
+        if config.sandbox_bots or (config.decision_workers > 0 and not threaded):
+            # Bots in child processes, one per bot or pinned to a pool of decision workers
+            sandbox = BotSandbox(bot_positions, game_map, bot_classes, rng=rng, move_time_limit=config.move_time_limit,
+                                 game_time_limit=config.game_time_limit, workers=config.decision_workers or None)
+            bot_names = sandbox.bot_names
+        else:
+            bots, bot_names = load_bots(bot_positions, game_map, bot_classes, rng=rng)
+            if threaded:    # No GIL, the bots think in parallel threads
+                thread_pool = ThreadPoolExecutor(max_workers=config.decision_workers)
         bot_food = {id: 1 for id in bot_positions.keys()}
         bot_ids = {id: BOT_ALIVE for id in range(1, number_of_bots + 1)} # Stores ALIVE/DEAD status
-        game_counter = MAX_GAME_MOVES
+        recorder = ReplayRecorder(game_map, bot_positions, bot_food, bot_names, seed) if replay_dir is not None else None
+        game_counter = config.max_game_moves
         num_alive_bots = number_of_bots
         rows = len(game_map); cols = len(game_map[0]) if rows > 0 else 0
         if rows <= 0 or cols <= 0: return None
+        resolve_moves = move_bots
+        if config.vectorized_moves:
+            # Mountains and out of bounds cells never change, so the allowed moves of every cell are listed once per game
+            resolve_moves = partial(move_bots_vectorized, neighbors=passable_neighbors(game_map))
+        minimaps = {}   # Minimap buffers reused every tick
+        time_budget = None
+        if sandbox is None and (config.move_time_limit is not None or config.game_time_limit is not None):
+            time_budget = BotTimeBudget(config.move_time_limit, config.game_time_limit)
 
         # --- Simulation Loop ---
         while game_counter > 0 and num_alive_bots > 1:
-            bot_directions = calculate_bot_directions(game_map, bots, bot_positions, bot_ids, bot_food)
-            move_bots(game_map, bot_ids, bot_positions, bot_directions, bot_food) # This updates bot_ids
+            if sandbox is not None:
+                bot_directions = sandbox.directions(game_map, bot_positions, bot_ids, bot_food)
+            elif thread_pool is not None:
+                bot_directions = calculate_bot_directions_threaded(thread_pool, game_map, bots, bot_positions, bot_ids, bot_food, minimaps, time_budget)
+            else:
+                bot_directions = calculate_bot_directions(game_map, bots, bot_positions, bot_ids, bot_food, minimaps, time_budget)
+            resolve_moves(game_map, bot_ids, bot_positions, bot_directions, bot_food) # This updates bot_ids
             num_alive_bots = sum(1 for i in bot_ids.values() if i == BOT_ALIVE)
-            if num_alive_bots <= 1: break
+            if num_alive_bots <= 1:
+                if recorder is not None: recorder.record_tick(bot_directions)
+                break
 
             # Food Generation
             total_cells = rows * cols
-            food_count = sum(row.count(FOOD_CELL) for row in game_map)
+            food_count = game_map.food_count
             current_food_percentage = food_count / total_cells if total_cells > 0 else 0
-            if current_food_percentage < MAX_FOOD_PERCENTAGE:
-                quantity_to_generate = num_alive_bots * FOOD_GENERATION_QUANTITY_PER_BOT
-                generate_food(game_map, quantity_to_generate)
+            food_cells = []
+            if current_food_percentage < config.max_food_percentage:
+                quantity_to_generate = num_alive_bots * config.food_generation_quantity_per_bot
+                food_cells = generate_food(game_map, quantity_to_generate, rng)
+            if recorder is not None: recorder.record_tick(bot_directions, food_cells)
 
             game_counter -= 1
 
@@ -90,15 +145,25 @@ def run_single_simulation():
         if winner_id != -1:
              winner_name = bot_names.get(winner_id, f"Bot {winner_id}")
 
+        replay_path = None
+        if recorder is not None:
+            os.makedirs(replay_dir, exist_ok=True)
+            replay_path = os.path.join(replay_dir, f"game_{seed}.pmwr")
+            recorder.save(replay_path)
+
         # --- Return results including final statuses ---
         return {
             "winner_id": winner_id,
             "winner_name": winner_name,
             "final_food": bot_food,
             "bot_names": bot_names,
-            "turns_lasted": MAX_GAME_MOVES - game_counter,
+            "turns_lasted": config.max_game_moves - game_counter,
             "timed_out": timed_out,
-            "final_status": bot_ids # <-- ADDED: Dictionary of {bot_id: BOT_ALIVE/BOT_DEAD}
+            "final_status": bot_ids, # <-- ADDED: Dictionary of {bot_id: BOT_ALIVE/BOT_DEAD}
+            "seed": seed,
+            "map_index": map_index,
+            "replay": replay_path,
+            "time_overruns": dict(sandbox.overruns if sandbox is not None else time_budget.overruns if time_budget is not None else {})
         }
 
     except Exception as e:
@@ -106,67 +171,148 @@ def run_single_simulation():
         import traceback
         traceback.print_exc()
         return None
+    finally:
+        if sandbox is not None:
+            sandbox.close()
+        if thread_pool is not None:
+            thread_pool.shutdown()
+
+# --- Worker Process Setup ---
+def init_worker():
+    """Imports the bots once in every worker process so that each game does not pay for it."""
+    get_bot_classes()
+
+def run_simulations(num_simulations: int, base_seed: int, workers: int = 1, config: GameConfig = None, map_bank_path: str = None,
+                    replay_dir: str = None):
+    """
+    Runs the simulations and yields every result as soon as its game finishes.
+    :param num_simulations: Number of games to play
+    :param base_seed: Seed of the first game, game i is played with seed base_seed + i
+    :param workers: Number of worker processes, 1 plays all games in this process
+    :param config: Game settings, the standard game if not given
+    :param map_bank_path: Map bank file to take the maps from, new maps are generated if None
+    :param replay_dir: Directory to save the replays of the games in, no replays if None
+    """
+    if workers <= 1:
+        for i in range(num_simulations):
+            yield run_single_simulation(base_seed + i, config, map_bank_path, replay_dir)
+        return
+
+    # Workers open the map bank by path, the memory-mapped file is shared between them
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_worker) as executor:
+        futures = [executor.submit(run_single_simulation, base_seed + i, config, map_bank_path, replay_dir) for i in range(num_simulations)]
+        for future in as_completed(futures):
+            yield future.result()
+
+def update_bot_stats(bot_stats: dict, bot_names_master: dict, result: dict):
+    """
+    Adds the result of one game to the aggregated bot statistics.
+    :param bot_stats: Nested dictionary of {bot_id -> {stat_name -> value}}
+    :param bot_names_master: Dictionary of {bot_id -> bot name} seen so far
+    :param result: Result dictionary returned by run_single_simulation
+    """
+    bot_names_master.update(result["bot_names"])
+    winner_id = result["winner_id"]
+    final_status = result["final_status"]
+
+    # Iterate through all bots that participated in this run (based on final_food keys)
+    for bot_id in result["final_food"].keys():
+        bot_stats[bot_id]['games_played'] += 1
+        bot_stats[bot_id]['total_food'] += result["final_food"].get(bot_id, 0)
+
+        # Check win/loss
+        if bot_id == winner_id:
+            bot_stats[bot_id]['wins'] += 1
+        else:
+            # It's a loss, determine type
+            status = final_status.get(bot_id, BOT_DEAD) # Assume dead if missing (shouldn't happen)
+            if status == BOT_DEAD:
+                bot_stats[bot_id]['losses_killed'] += 1
+            elif status == BOT_ALIVE:
+                # Must have lost on score at timeout
+                bot_stats[bot_id]['losses_score'] += 1
+            else: # Should not happen
+                 bot_stats[bot_id]['losses_unknown'] += 1
+
+    for bot_id, overruns in result.get("time_overruns", {}).items():
+        bot_stats[bot_id]['time_overruns'] += overruns
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Run headless PacmanWars games and report bot statistics.")
+    parser.add_argument("--workers", type=int, default=1, help="Number of worker processes to spread the games across")
+    parser.add_argument("--simulations", type=int, default=NUM_SIMULATIONS, help="Number of games to play")
+    parser.add_argument("--seed", type=int, default=None, help="Seed of the first game (random if not given)")
+    parser.add_argument("--rows", type=int, default=ROWS, help="Number of rows of the board")
+    parser.add_argument("--cols", type=int, default=COLS, help="Number of columns of the board")
+    parser.add_argument("--bots", type=int, default=None, help="Number of bots, the bot classes are reused in turn (default: one per bot class)")
+    parser.add_argument("--mountain-coverage", type=int, default=GameConfig.mountain_coverage, help="Number of mountain cells to be generated")
+    parser.add_argument("--out-of-bounds-probability", type=float, default=GameConfig.out_of_bounds_probability, help="Probability of an edge cell being out of bounds")
+    parser.add_argument("--move-time-limit", type=float, default=None, help="CPU seconds a bot may spend on one move, slower moves become MOVE_HALT")
+    parser.add_argument("--game-time-limit", type=float, default=None, help="CPU seconds a bot may spend on all its moves of a game")
+    parser.add_argument("--sandbox", action="store_true", help="Run every bot in its own process, a crashing or hanging bot only halts itself")
+    parser.add_argument("--decision-workers", type=int, default=0, help="Let the bots of a game decide their moves in parallel on this many workers")
+    parser.add_argument("--vectorized-moves", action="store_true", help="Resolve moves and fights with NumPy, faster with hundreds of bots")
+    parser.add_argument("--record-replays", default=None, metavar="DIR", help="Save a replay of every game in this directory")
+    parser.add_argument("--map-bank", default=None, metavar="DIR", help="Play on maps from a map bank cached in this directory (built on first use)")
+    parser.add_argument("--bank-size", type=int, default=MAP_BANK_SIZE, help="Number of maps in the map bank")
+    parser.add_argument("--bank-seed", type=int, default=0, help="Seed of the map bank, the same seed and settings give the same maps")
+    args = parser.parse_args()
+    if not 0 < args.out_of_bounds_probability <= MAX_OUT_OF_BOUND_PROBABILITY:
+        parser.error(f"--out-of-bounds-probability should be greater than 0 and at most {MAX_OUT_OF_BOUND_PROBABILITY}")
+    return args
 
 # --- Main Simulation Runner ---
 if __name__ == "__main__":
+    args = parse_args()
+    base_seed = args.seed if args.seed is not None else random.randrange(2**32)
+    config = GameConfig(rows=args.rows, cols=args.cols, number_of_bots=args.bots,
+                        mountain_coverage=args.mountain_coverage,
+                        out_of_bounds_probability=args.out_of_bounds_probability,
+                        move_time_limit=args.move_time_limit,
+                        game_time_limit=args.game_time_limit,
+                        sandbox_bots=args.sandbox,
+                        decision_workers=args.decision_workers,
+                        vectorized_moves=args.vectorized_moves)
+
+    map_bank_path = None
+    if args.map_bank is not None:
+        print(f"Loading map bank of {args.bank_size} maps from {args.map_bank} (generating it if needed)...")
+        map_bank_path = load_map_bank(args.map_bank, args.bank_size, args.bank_seed, config).path
+
     # --- Run Simulations ---
-    print(f"Starting {NUM_SIMULATIONS} simulations...")
+    print(f"Starting {args.simulations} simulations with {max(args.workers, 1)} worker(s), base seed {base_seed}...")
     start_time = time.time()
-    simulation_results = []
-    for i in range(NUM_SIMULATIONS):
+
+    # Use nested defaultdict for easier stat tracking per bot
+    # bot_stats[bot_id]['stat_name'] = value
+    bot_stats = defaultdict(lambda: defaultdict(int))
+    bot_names_master = {}
+    total_turns = 0
+    num_successful = 0
+
+    # Results are aggregated in completion order as they stream back from the workers
+    for i, result in enumerate(run_simulations(args.simulations, base_seed, args.workers, config, map_bank_path, args.record_replays)):
         # Simple progress indicator
-        print(f"\r  Running simulation {i + 1}/{NUM_SIMULATIONS}...", end="")
-        result = run_single_simulation()
+        print(f"\r  Finished simulation {i + 1}/{args.simulations}...", end="")
         if result:
-            simulation_results.append(result)
+            num_successful += 1
+            total_turns += result["turns_lasted"]
+            update_bot_stats(bot_stats, bot_names_master, result)
         # else: # Optional: Log skipped/failed runs
             # print(f"\n  Simulation {i+1} failed or was skipped.")
     print("\nFinished.") # Newline after progress indicator
     end_time = time.time()
-    print(f"Completed {len(simulation_results)} successful simulations in {end_time - start_time:.2f} seconds.")
+    print(f"Completed {num_successful} successful simulations in {end_time - start_time:.2f} seconds.")
 
     # --- Aggregate Statistics ---
-    if not simulation_results:
+    if num_successful == 0:
         print("No successful simulations to analyze.")
         sys.exit(0)
 
-    # Use nested defaultdict for easier stat tracking per bot
-    # bot_stats[bot_id]['stat_name'] = value
-    bot_stats = defaultdict(lambda: defaultdict(int))
-    bot_names_master = {}
-    total_turns = 0
-
-    for result in simulation_results:
-        total_turns += result["turns_lasted"]
-        bot_names_master.update(result["bot_names"])
-        winner_id = result["winner_id"]
-        timed_out = result["timed_out"]
-        final_status = result["final_status"]
-
-        # Iterate through all bots that participated in this run (based on final_food keys)
-        for bot_id in result["final_food"].keys():
-            bot_stats[bot_id]['games_played'] += 1
-            bot_stats[bot_id]['total_food'] += result["final_food"].get(bot_id, 0)
-
-            # Check win/loss
-            if bot_id == winner_id:
-                bot_stats[bot_id]['wins'] += 1
-            else:
-                # It's a loss, determine type
-                status = final_status.get(bot_id, BOT_DEAD) # Assume dead if missing (shouldn't happen)
-                if status == BOT_DEAD:
-                    bot_stats[bot_id]['losses_killed'] += 1
-                elif status == BOT_ALIVE:
-                    # Must have lost on score at timeout
-                    bot_stats[bot_id]['losses_score'] += 1
-                else: # Should not happen
-                     bot_stats[bot_id]['losses_unknown'] += 1
-
-
     # --- Print Statistics ---
     print("\n--- Simulation Statistics ---")
-    print(f"Total Successful Runs: {len(simulation_results)}")
-    avg_turns = total_turns / len(simulation_results) if len(simulation_results) > 0 else 0
+    print(f"Total Successful Runs: {num_successful}")
+    avg_turns = total_turns / num_successful
     print(f"Average Game Length: {avg_turns:.2f} turns")
 
     print("\n--- Bot Performance ---")
@@ -196,6 +342,8 @@ if __name__ == "__main__":
             print(f"      - Score:      {losses_s} ({loss_s_perc:.2f}% of losses)")
             if losses_u > 0: print(f"      - Unknown:    {losses_u}") # Report if any unknown losses occurred
         print(f"    - Avg Food:     {avg_food:.2f}")
+        if stats['time_overruns'] > 0:
+            print(f"    - Time Overruns: {stats['time_overruns']} moves ({stats['time_overruns'] / games_played:.2f} per game)")
 
 
     print("\n--- End of Report ---")